@@ -0,0 +1,89 @@
+"""Startup benchmark: time from process start to the first processed message.
+
+Requires a reachable Kafka broker (see docker-compose.yml). Each run starts a
+fresh interpreter, starts the services, produces one probe Opportunity event
+and waits until the consumer has written its first batch.
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import time
+
+PROCESS_START = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+async def single_run(topic: str, timeout: float) -> dict:
+    import main
+    from aiokafka import AIOKafkaProducer
+    from consumer_utils.startup_timer import startup_timer
+
+    await main.start_services()
+    producer = AIOKafkaProducer(bootstrap_servers=main.consumer_service.settings.KAFKA_BOOTSTRAP_SERVERS)
+    await producer.start()
+    try:
+        probe = {
+            "object_type": "Opportunity",
+            "event_id": f"startup_probe_{uuid.uuid4().hex}",
+            "name": "Startup probe",
+            "stage": "Prospecting",
+            "amount": 0.0,
+            "probability": 0.0,
+            "expected_close_date": "2024-01-01",
+            "account_id": "benchmark",
+            "owner_id": "benchmark"
+        }
+        await producer.send_and_wait(topic, json.dumps(probe).encode("utf-8"))
+    finally:
+        await producer.stop()
+
+    deadline = time.perf_counter() + timeout
+    while "first_message" not in startup_timer.phases and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    await main.stop_services()
+
+    # Phases relative to interpreter start rather than the timer's import
+    offset = startup_timer.origin - PROCESS_START
+    return {phase: round(elapsed + offset, 4) for phase, elapsed in startup_timer.phases.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--topic", default="sales_events")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(asyncio.run(single_run(args.topic, args.timeout))))
+        return
+
+    results = []
+    for run in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--single", "--topic", args.topic, "--timeout", str(args.timeout)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        results.append(json.loads(output))
+        print(f"run {run + 1}: {results[-1]}")
+
+    phases = sorted({phase for result in results for phase in result}, key=lambda p: results[0].get(p, 0))
+    print(f"{'phase':<20}{'median s':>10}{'max s':>10}")
+    for phase in phases:
+        values = [result[phase] for result in results if phase in result]
+        print(f"{phase:<20}{statistics.median(values):>10.3f}{max(values):>10.3f}")
+    if any("first_message" not in result for result in results):
+        print("warning: some runs timed out before the first message")
+
+if __name__ == "__main__":
+    main()
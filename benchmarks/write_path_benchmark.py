@@ -0,0 +1,131 @@
+"""Write path benchmark: Core executemany records vs. the ORM.
+
+Writes the same generated Opportunity events through each path into a fresh
+SQLite file and reports throughput and peak traced memory:
+
+    repository  the original path: per event, a new session and repository,
+                then one ORM instance with commit and refresh
+    orm         ProcessingService with WRITE_PATH=orm, one commit per batch
+    core        ProcessingService with WRITE_PATH=core, one commit per batch
+
+The batch paths open one session per batch. With --batch-size 1 they commit
+once per event like the repository path, so the difference is the
+per-message setup and ORM work that the batch paths no longer do.
+
+Every path runs twice: once timed, once under tracemalloc, so the tracing
+overhead does not skew throughput. Half of the events update keys written
+earlier in the run.
+
+Usage:
+    python benchmarks/write_path_benchmark.py --events 20000 --batch-size 500
+    python benchmarks/write_path_benchmark.py --events 5000 --batch-size 1 --paths core
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy.orm import sessionmaker
+
+from consumer_business.object_registry import to_date
+from consumer_business.processing_service import ProcessingService
+from consumer_repository.opportunity_repository import OpportunityRepository
+from core.constants_sample import WRITE_PATH_CORE, WRITE_PATH_ORM
+from database import Base
+from database.connection import create_database_engine
+
+PATHS = ("repository", WRITE_PATH_ORM, WRITE_PATH_CORE)
+
+def generate_events(count: int) -> list:
+    keys = max(count // 2, 1)
+    return [
+        {
+            "object_type": "Opportunity",
+            "event_id": f"bench_{i % keys}",
+            "version": i,
+            "name": f"Opportunity {i}",
+            "stage": "Prospecting",
+            "amount": float(i),
+            "probability": 0.5,
+            "expected_close_date": "2024-06-30",
+            "account_id": f"acc_{i % 97}",
+            "owner_id": f"usr_{i % 13}",
+            "meta_data": {"source": "benchmark", "sequence": i}
+        }
+        for i in range(count)
+    ]
+
+def write_repository(session_factory, events: list) -> None:
+    for event in events:
+        # Per-message setup of the original consumer
+        db = session_factory()
+        try:
+            repository = OpportunityRepository(db)
+            obj_in = {key: value for key, value in event.items() if key not in ("object_type", "version")}
+            obj_in["expected_close_date"] = to_date(obj_in["expected_close_date"])
+            existing = repository.get_by_event_id(db, event["event_id"])
+            if existing is None:
+                repository.create(db, obj_in)
+            else:
+                repository.update(db, existing, obj_in)
+        finally:
+            db.close()
+
+async def write_batches(engine, events: list, batch_size: int, write_path: str) -> None:
+    service = ProcessingService(write_path=write_path)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    for start in range(0, len(events), batch_size):
+        db = session_factory()
+        try:
+            await service.process_batch(events[start:start + batch_size], db)
+            db.commit()
+        finally:
+            db.close()
+
+def run(path: str, events: list, batch_size: int, traced: bool) -> float:
+    """Seconds taken, or peak traced bytes when ``traced``"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_database_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        gc.collect()
+        if traced:
+            tracemalloc.start()
+        started = time.perf_counter()
+        if path == "repository":
+            write_repository(sessionmaker(autocommit=False, autoflush=False, bind=engine), events)
+        else:
+            asyncio.run(write_batches(engine, events, batch_size, path))
+        result = time.perf_counter() - started
+        if traced:
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        engine.dispose()
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS))
+    args = parser.parse_args()
+
+    # The repository path logs every call; keep the benchmark output readable
+    logging.disable(logging.INFO)
+
+    events = generate_events(args.events)
+    print(f"{'path':<16}{'seconds':>10}{'events/s':>12}{'peak KiB':>12}")
+    for path in args.paths:
+        seconds = run(path, events, args.batch_size, traced=False)
+        peak = run(path, events, args.batch_size, traced=True)
+        print(f"{path:<16}{seconds:>10.3f}{len(events) / seconds:>12.0f}{peak / 1024:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List
 from sqlalchemy.orm import Session
 
 class IProcessingService(ABC):
@@ -8,6 +8,16 @@ class IProcessingService(ABC):
         """Process a message and store it in the database"""
         pass
     
+    @abstractmethod
+    async def process_batch(self, messages: List[Dict[str, Any]], db: Session) -> Dict[str, Dict[str, int]]:
+        """Process a batch of messages and store them in the database"""
+        pass
+    
+    @abstractmethod
+    def validate_batch(self, messages: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Coerce message fields in place and return validation errors by index"""
+        pass
+    
     @abstractmethod
     def get_processor(self, object_type: str):
         """Get the appropriate processor for the object type"""
@@ -16,4 +26,4 @@ class IProcessingService(ABC):
     @abstractmethod
     def register_processor(self, object_type: str, processor):
         """Register a new processor for an object type"""
-        pass 
\ No newline at end of file
+        pass
@@ -0,0 +1,517 @@
+import hashlib
+import json
+import math
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, Callable, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from sqlalchemy import Boolean, Date, Float, Integer, String, bindparam, func, null, or_, update
+from sqlalchemy.engine import Dialect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from consumer_entities.opportunity_model import Opportunity
+from consumer_entities.project_model import Project
+from core.constants_sample import OBJECT_TYPE_OPPORTUNITY, OBJECT_TYPE_PROJECT
+
+# A payload key, or several keys tried in order (first present wins)
+FieldSource = Union[str, Tuple[str, ...]]
+# Extracted row values in ``ObjectTypeSpec.record_columns`` order
+Record = Tuple[Any, ...]
+
+@lru_cache(maxsize=4096)
+def parse_iso_date(value: str) -> date:
+    """Parse an ISO date, or the date part of an ISO timestamp.
+
+    Memoized: a small set of close and start dates repeats across events.
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+def to_date(value: Any) -> Optional[date]:
+    """Convert an ISO date string to a date"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return parse_iso_date(value)
+    raise ValueError(f"Unsupported date value: {value!r}")
+
+def to_float(value: Any) -> Optional[float]:
+    """Convert a number or numeric string to a finite float"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"Expected a number, got {value!r}")
+    result = float(value)
+    if not math.isfinite(result):
+        raise ValueError(f"Expected a finite number, got {value!r}")
+    return result
+
+def to_int(value: Any) -> Optional[int]:
+    """Convert an integer, integral float or digit string to an int"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"Expected an integer, got {value!r}")
+    return int(value)
+
+def to_bool(value: Any) -> Optional[bool]:
+    """Convert a boolean, 0/1 or "true"/"false" to a bool"""
+    if value is None or isinstance(value, bool):
+        return value
+    if value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in ("true", "false", "1", "0"):
+        return value.lower() in ("true", "1")
+    raise ValueError(f"Expected a boolean, got {value!r}")
+
+def to_str(value: Any) -> Optional[str]:
+    """Convert a string or number to a str; objects and arrays are rejected"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Expected a string, got {type(value).__name__}")
+
+# Coercion applied to mapped fields by column type, unless a converter is declared.
+# JSON columns have none, so they keep whatever structure the payload sent
+TYPE_COERCERS: Tuple[Tuple[type, Callable[[Any], Any]], ...] = (
+    (Date, to_date),
+    (Float, to_float),
+    (Integer, to_int),
+    (Boolean, to_bool),
+    (String, to_str),
+)
+
+def to_version(value: Any) -> Optional[int]:
+    """Normalize an event version or source timestamp to a comparable integer.
+
+    Integers are used as-is; ISO-8601 timestamps become epoch microseconds.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        if value.isdigit():
+            return int(value)
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1_000_000)
+    raise ValueError(f"Unsupported version value: {value!r}")
+
+def content_hash(values: Sequence[Any]) -> str:
+    """Compact hash of a normalized row's values in column order.
+
+    Keys of JSON values are sorted, so a producer reordering them is not a change.
+    """
+    normalized = json.dumps(values, separators=(",", ":"), sort_keys=True, default=str)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+class ObjectTypeSpec:
+    """Declarative mapping of an object type onto its model.
+
+    The field mapping is compiled once into an extractor that builds a tuple
+    record (ending with its ``content_hash``) for a payload in a single call,
+    and into a batch upsert statement keyed on ``key`` that leaves rows whose
+    hash is unchanged untouched. When ``version`` names the payload field(s)
+    holding an event version or source timestamp, the statement also refuses
+    to overwrite a row with an older version, giving last-writer-wins without
+    a read before the write.
+    """
+
+    def __init__(
+        self,
+        object_type: str,
+        model: Type,
+        key: str,
+        fields: Dict[str, FieldSource],
+        defaults: Optional[Dict[str, Any]] = None,
+        converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        version: Optional[FieldSource] = None
+    ):
+        self.object_type = object_type
+        self.model = model
+        self.table = model.__table__
+        self.key = key
+        self.fields = {key: key, **fields}
+        self.defaults = defaults or {}
+        self.converters = converters or {}
+        self.versioned = version is not None
+        if self.versioned:
+            self.fields["source_version"] = version
+            self.converters["source_version"] = to_version
+        self._validate()
+        self._sources = {
+            column: (sources,) if isinstance(sources, str) else tuple(sources)
+            for column, sources in self.fields.items()
+        }
+        # Payload keys holding the event version, first present wins
+        self.version_sources = self._sources.get("source_version", ())
+        self.coercers = {
+            column: coercer
+            for column, coercer in ((column, self._coercer(column)) for column in self.fields)
+            if coercer is not None
+        }
+        # Mapped columns that must be present unless a default fills them
+        self.required = frozenset(
+            column for column in self.fields
+            if not self.table.c[column].nullable
+            and self.table.c[column].default is None
+            and column not in self.defaults
+        )
+        # Payload keys this type reads, so decoders can skip everything else
+        self.payload_keys = frozenset(
+            source
+            for sources in self.fields.values()
+            for source in ((sources,) if isinstance(sources, str) else sources)
+        )
+        self.columns = tuple(self.fields)
+        self.record_columns = self.columns + ("content_hash",)
+        self.key_index = self.record_columns.index(self.key)
+        self.version_index = self.record_columns.index("source_version") if self.versioned else None
+        self.extract: Callable[[Dict[str, Any]], Record] = self._compile_extractor()
+        self.upsert_statement = self._compile_upsert()
+        self.tombstone_statement = self._compile_tombstone()
+        # dialect name -> (driver SQL, record binder, columns filled from defaults)
+        self._positional: Dict[str, Tuple[str, Callable, Tuple]] = {}
+
+    def _validate(self) -> None:
+        """Reject mappings that drifted away from the model"""
+        for column in list(self.fields) + list(self.defaults) + list(self.converters):
+            if column not in self.table.columns:
+                raise ValueError(f"{self.object_type}: {self.model.__name__} has no column '{column}'")
+        key_column = self.table.columns[self.key]
+        if not key_column.unique:
+            raise ValueError(f"{self.object_type}: key column '{self.key}' must be unique")
+
+    def _coercer(self, column: str) -> Optional[Callable[[Any], Any]]:
+        if column in self.converters:
+            return self.converters[column]
+        column_type = self.table.c[column].type
+        return next((coercer for sql_type, coercer in TYPE_COERCERS if isinstance(column_type, sql_type)), None)
+
+    def coerce_batch(self, payloads: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Validate and coerce the mapped fields of a batch of payloads in place.
+
+        Works column by column: each field's values are converted for the
+        whole batch in one pass, falling back to value-by-value conversion
+        only to pinpoint the bad ones. Returns the errors by payload index;
+        those payloads should not be written.
+        """
+        errors: Dict[int, str] = {}
+        for column, sources in self._sources.items():
+            coercer = self.coercers.get(column)
+            required = column in self.required
+            if coercer is None and not required:
+                continue
+            if len(sources) == 1:
+                source = sources[0]
+                keys = [source if source in payload else None for payload in payloads]
+            else:
+                keys = [next((s for s in sources if s in payload), None) for payload in payloads]
+            values = [payload[key] if key is not None else None for payload, key in zip(payloads, keys)]
+            if required:
+                for index, value in enumerate(values):
+                    if value is None:
+                        errors.setdefault(index, f"{column} is required")
+            if coercer is None:
+                continue
+            try:
+                converted = list(map(coercer, values))
+            except (TypeError, ValueError, OverflowError):
+                converted = []
+                for index, value in enumerate(values):
+                    try:
+                        converted.append(coercer(value))
+                    except (TypeError, ValueError, OverflowError) as e:
+                        errors.setdefault(index, f"{column}: {str(e)}")
+                        converted.append(value)
+            for payload, key, value in zip(payloads, keys, converted):
+                if key is not None:
+                    payload[key] = value
+        return errors
+
+    def coerce_deletes(self, payloads: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Validate delete events in place: the key is required and a version, when sent, must parse.
+
+        Returns the errors by payload index, like ``coerce_batch``.
+        """
+        errors: Dict[int, str] = {}
+        for index, payload in enumerate(payloads):
+            if payload.get(self.key) is None:
+                errors[index] = f"{self.key} is required"
+                continue
+            source = next((source for source in self.version_sources if source in payload), None)
+            if source is None:
+                continue
+            try:
+                payload[source] = to_version(payload[source])
+            except (TypeError, ValueError, OverflowError) as e:
+                errors[index] = f"source_version: {str(e)}"
+        return errors
+
+    def delete_version(self, payload: Dict[str, Any]) -> Optional[int]:
+        """Normalized version of a delete event, if it carries one"""
+        source = next((source for source in self.version_sources if source in payload), None)
+        return to_version(payload[source]) if source is not None else None
+
+    def _source_expression(self, column: str, sources: FieldSource) -> str:
+        if isinstance(sources, str):
+            sources = (sources,)
+        expression = f"_defaults[{column!r}]" if column in self.defaults else "None"
+        for source in reversed(sources):
+            expression = f"d.get({source!r}, {expression})" if expression != "None" else f"d.get({source!r})"
+        if column in self.converters:
+            expression = f"_converters[{column!r}]({expression})"
+        return expression
+
+    def _compile_extractor(self) -> Callable[[Dict[str, Any]], Record]:
+        """Generate one function that builds the tuple record for a payload"""
+        items = "".join(
+            f"{self._source_expression(column, sources)}, "
+            for column, sources in self.fields.items()
+        )
+        source = (
+            f"def extract(d):\n"
+            f"    values = ({items})\n"
+            f"    return values + (_hash(values),)\n"
+        )
+        namespace = {"_defaults": self.defaults, "_converters": self.converters, "_hash": content_hash}
+        exec(compile(source, f"<extractor {self.object_type}>", "exec"), namespace)
+        return namespace["extract"]
+
+    def _compile_upsert(self):
+        """Build the INSERT ... ON CONFLICT DO UPDATE statement for batches"""
+        stmt = sqlite_insert(self.table)
+        update_columns = {
+            column: stmt.excluded[column]
+            for column in self.record_columns
+            if column != self.key
+        }
+        update_columns["updated_at"] = func.current_timestamp()
+        # An upsert for a tombstoned key revives the row
+        update_columns["deleted_at"] = null()
+        live = self.table.c.deleted_at.is_(None)
+        changed = self.table.c.content_hash.is_distinct_from(stmt.excluded.content_hash)
+        if self.versioned:
+            # Unversioned events keep the stored version as the high-water mark
+            update_columns["source_version"] = func.coalesce(
+                stmt.excluded.source_version, self.table.c.source_version
+            )
+            stored = self.table.c.source_version
+            newer = stmt.excluded.source_version > stored
+            where = or_(
+                live & changed & or_(stmt.excluded.source_version.is_(None), stored.is_(None), newer),
+                # Only a newer version revives a tombstone that recorded one
+                ~live & or_(stored.is_(None), newer)
+            )
+        else:
+            where = or_(changed, ~live)
+        return stmt.on_conflict_do_update(
+            index_elements=[self.key],
+            set_=update_columns,
+            where=where
+        )
+
+    def _compile_tombstone(self):
+        """Build the UPDATE that soft-deletes a batch of keys.
+
+        Versioned types tombstone one key per parameter set, and only rows
+        older than the delete; the delete's version is stored so an older
+        upsert cannot revive the row.
+        """
+        deleted_at = bindparam("deleted_at")
+        stmt = update(self.table).where(self.table.c.deleted_at.is_(None))
+        if not self.versioned:
+            return (
+                stmt.where(self.table.c[self.key].in_(bindparam("keys", expanding=True)))
+                .values(deleted_at=deleted_at, updated_at=deleted_at)
+            )
+        version = bindparam("tombstone_version", type_=self.table.c.source_version.type)
+        stored = self.table.c.source_version
+        return (
+            stmt.where(self.table.c[self.key] == bindparam("tombstone_key"))
+            .where(or_(version.is_(None), stored.is_(None), version > stored))
+            .values(
+                deleted_at=deleted_at,
+                updated_at=deleted_at,
+                source_version=func.coalesce(version, stored)
+            )
+        )
+
+    def _compile_positional(self, dialect: Dialect) -> Tuple[str, Callable, Tuple]:
+        """Compile the upsert to driver SQL plus a function binding a record.
+
+        The binder reorders a record into the statement's parameter order and
+        applies the column types' bind processors, so records go straight to
+        the driver's ``executemany`` without building a dict per row. Columns
+        the record does not carry (``created_at``, ``updated_at``) are filled
+        from their defaults once per batch.
+        """
+        compiled = self.upsert_statement.compile(dialect=dialect, column_keys=list(self.record_columns))
+        if not compiled.positional:
+            raise ValueError(f"{self.object_type}: dialect {dialect.name} does not use positional parameters")
+        processors: Dict[str, Callable] = {}
+        defaulted = []
+        items = []
+        for name in compiled.positiontup:
+            bind_type = compiled.binds[name].type
+            processor = bind_type.dialect_impl(dialect).bind_processor(dialect)
+            if name in self.record_columns:
+                expression = f"r[{self.record_columns.index(name)}]"
+            else:
+                default = self.table.c[name].default
+                if default is None:
+                    raise ValueError(f"{self.object_type}: no value for parameter '{name}'")
+                expression = f"c[{len(defaulted)}]"
+                defaulted.append(default)
+            if processor is not None:
+                processors[name] = processor
+                expression = f"_p[{name!r}]({expression})"
+            items.append(f"{expression}, ")
+        source = f"def bind(r, c):\n    return ({''.join(items)})\n"
+        namespace = {"_p": processors}
+        exec(compile(source, f"<binder {self.object_type}>", "exec"), namespace)
+        return str(compiled), namespace["bind"], tuple(defaulted)
+
+    def upsert(self, db: Session, records: List[Record]) -> int:
+        """Insert or update a batch of extracted records in one executemany.
+
+        Bypasses the ORM entirely: no instances, identity map or refresh.
+        Returns the number of rows written; rows whose content hash matches
+        the stored one, or whose version is older than the stored one, are
+        skipped by the statement itself.
+        """
+        connection = db.connection()
+        dialect = connection.dialect
+        positional = self._positional.get(dialect.name)
+        if positional is None:
+            positional = self._positional[dialect.name] = self._compile_positional(dialect)
+        sql, bind, defaulted = positional
+        constants = tuple(
+            default.arg(None) if default.is_callable else default.arg
+            for default in defaulted
+        )
+        return connection.exec_driver_sql(sql, [bind(record, constants) for record in records]).rowcount
+
+    def upsert_orm(self, db: Session, records: List[Record]) -> int:
+        """ORM equivalent of ``upsert``: one SELECT, then instances in the session.
+
+        Applies the same hash and version rules in Python. Kept for
+        ``WRITE_PATH=orm`` and as the baseline for the write path benchmark.
+        """
+        rows = [dict(zip(self.record_columns, record)) for record in records]
+        key_attribute = getattr(self.model, self.key)
+        existing = {
+            getattr(obj, self.key): obj
+            for obj in db.query(self.model).filter(key_attribute.in_([row[self.key] for row in rows]))
+        }
+        applied = 0
+        for row in rows:
+            obj = existing.get(row[self.key])
+            if obj is None:
+                db.add(self.model(**row))
+                applied += 1
+                continue
+            if obj.content_hash == row["content_hash"] and obj.deleted_at is None:
+                continue
+            if self.versioned:
+                if row["source_version"] is None:
+                    if obj.deleted_at is not None and obj.source_version is not None:
+                        # Only a newer version revives a tombstone that recorded one
+                        continue
+                    row["source_version"] = obj.source_version
+                elif obj.source_version is not None and row["source_version"] <= obj.source_version:
+                    continue
+            for column, value in row.items():
+                setattr(obj, column, value)
+            obj.deleted_at = None
+            applied += 1
+        db.flush()
+        return applied
+
+    def soft_delete(self, db: Session, keys: List[Any], versions: Optional[List[Optional[int]]] = None) -> int:
+        """Tombstone a batch of keys, with the delete events' versions for versioned types"""
+        deleted_at = datetime.utcnow()
+        if not self.versioned:
+            return db.execute(self.tombstone_statement, {"keys": keys, "deleted_at": deleted_at}).rowcount
+        versions = versions or [None] * len(keys)
+        result = db.connection().execute(self.tombstone_statement, [
+            {"tombstone_key": key, "tombstone_version": version, "deleted_at": deleted_at}
+            for key, version in zip(keys, versions)
+        ])
+        return result.rowcount
+
+class ObjectRegistry:
+    """Registry of the object types the consumer can persist"""
+
+    def __init__(self):
+        self._specs: Dict[str, ObjectTypeSpec] = {}
+
+    def register(self, spec: ObjectTypeSpec) -> ObjectTypeSpec:
+        self._specs[spec.object_type] = spec
+        return spec
+
+    def get(self, object_type: str) -> Optional[ObjectTypeSpec]:
+        return self._specs.get(object_type)
+
+    def payload_keys(self) -> FrozenSet[str]:
+        """Union of the payload keys read by all registered types"""
+        return frozenset().union(*(spec.payload_keys for spec in self._specs.values()))
+
+    def __contains__(self, object_type: str) -> bool:
+        return object_type in self._specs
+
+    def __iter__(self) -> Iterator[ObjectTypeSpec]:
+        return iter(self._specs.values())
+
+registry = ObjectRegistry()
+
+registry.register(ObjectTypeSpec(
+    OBJECT_TYPE_OPPORTUNITY,
+    model=Opportunity,
+    key="event_id",
+    fields={
+        "name": "name",
+        "stage": "stage",
+        "amount": "amount",
+        "probability": "probability",
+        "expected_close_date": "expected_close_date",
+        "account_id": "account_id",
+        "owner_id": "owner_id",
+        "meta_data": ("meta_data", "metadata"),
+    },
+    converters={"expected_close_date": to_date},
+    version=("version", "source_timestamp")
+))
+
+registry.register(ObjectTypeSpec(
+    OBJECT_TYPE_PROJECT,
+    model=Project,
+    key="event_id",
+    fields={
+        "name": "name",
+        "status": "status",
+        "start_date": "start_date",
+        "end_date": "end_date",
+        "budget": "budget",
+        "is_active": "is_active",
+        "manager_id": ("manager_id", "owner_id"),
+        "client_id": ("client_id", "account_id"),
+        "meta_data": ("meta_data", "metadata"),
+    },
+    defaults={"is_active": True},
+    converters={"start_date": to_date, "end_date": to_date},
+    version=("version", "source_timestamp")
+))
@@ -1,109 +1,143 @@
-from typing import Dict, Any, Type, Callable
+import asyncio
+from typing import Dict, Any, List, Callable, Optional, Tuple
 from sqlalchemy.orm import Session
-from .interfaces.i_processing_service import IProcessingService
-from ..consumer_repository.opportunity_repository import OpportunityRepository
-from ..consumer_repository.project_repository import ProjectRepository
-from ..consumer_entities.opportunity_model import Opportunity
-from ..consumer_entities.project_model import Project
-from ..core.config import settings
-import logging
+from consumer_business.interfaces.i_processing_service import IProcessingService
+from consumer_business.object_registry import ObjectRegistry, Record, registry as default_registry
+from consumer_utils.logger import setup_logger
+from core.constants_sample import EVENT_TYPE_DELETE, WRITE_PATH_CORE, WRITE_PATH_ORM
 
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
 class ProcessingService(IProcessingService):
-    def __init__(self):
+    """Dispatch messages to the upsert compiled for their object type"""
+
+    def __init__(self, registry: ObjectRegistry = default_registry, write_path: str = WRITE_PATH_CORE):
+        if write_path not in (WRITE_PATH_CORE, WRITE_PATH_ORM):
+            raise ValueError(f"Unknown write path: {write_path}")
+        self.registry = registry
+        self.write_path = write_path
         self.processors: Dict[str, Callable] = {}
-        self.repositories: Dict[str, Any] = {
-            "Opportunity": OpportunityRepository(),
-            "Project": ProjectRepository()
-        }
-        self._register_default_processors()
-    
-    def _register_default_processors(self):
-        """Register default processors for known object types"""
-        self.register_processor("Opportunity", self._process_opportunity)
-        self.register_processor("Project", self._process_project)
+        self.stats: Dict[str, Dict[str, int]] = {}
     
     async def process_message(self, message: Dict[str, Any], db: Session) -> None:
         """Process a message and store it in the database"""
-        try:
+        await self.process_batch([message], db)
+    
+    async def process_batch(self, messages: List[Dict[str, Any]], db: Session) -> Dict[str, Dict[str, int]]:
+        """Group messages by object type and write each group in bulk.
+
+        Custom processors run on the event loop; registry types are written
+        by ``write_registered`` in a worker thread so the loop keeps fetching
+        and scheduling other lanes meanwhile. The caller owns the transaction
+        and commits once for the whole batch. Returns applied/deleted/skipped
+        counts per object type for this batch.
+        """
+        counts: Dict[str, Dict[str, int]] = {}
+        registered = []
+        for message in messages:
+            object_type = message.get("object_type")
+            processor = self.processors.get(object_type)
+            if processor is not None:
+                await processor(message, db)
+                self._count(counts, object_type, applied=1)
+            else:
+                registered.append(message)
+        if registered:
+            written = await asyncio.to_thread(self.write_registered, registered, db)
+            for object_type, batch_counts in written.items():
+                self._count(counts, object_type, **batch_counts)
+        return counts
+
+    def validate_batch(self, messages: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Coerce registry messages' fields in place, a whole batch at a time.
+
+        Returns validation errors by message index. Delete events are only
+        checked for their key and version; types with custom processors are
+        not validated.
+        """
+        # object_type -> (upsert indexes, delete indexes)
+        groups: Dict[str, Tuple[List[int], List[int]]] = {}
+        for index, message in enumerate(messages):
             object_type = message.get("object_type")
-            if not object_type:
-                logger.error("Message missing object_type")
-                return
-            
-            processor = self.get_processor(object_type)
-            if not processor:
-                logger.error(f"No processor found for object_type: {object_type}")
-                return
-            
-            await processor(message, db)
-            
-        except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-            raise
+            if object_type in self.processors or object_type not in self.registry:
+                continue
+            upserts, deletes = groups.setdefault(object_type, ([], []))
+            (deletes if message.get("event_type") == EVENT_TYPE_DELETE else upserts).append(index)
+        errors: Dict[int, str] = {}
+        for object_type, (upserts, deletes) in groups.items():
+            spec = self.registry.get(object_type)
+            for indexes, coerce in ((upserts, spec.coerce_batch), (deletes, spec.coerce_deletes)):
+                if not indexes:
+                    continue
+                for position, error in coerce([messages[index] for index in indexes]).items():
+                    errors[indexes[position]] = error
+        return errors
+
+    def write_registered(self, messages: List[Dict[str, Any]], db: Session) -> Dict[str, Dict[str, int]]:
+        """Write messages of registry object types, blocking.
+
+        Upserts go out as one statement per object type and delete events as
+        one tombstone UPDATE per object type. Only one event per key in the
+        batch is written: the one with the highest version, or the last one
+        when versions are missing, matching the rule the statements apply
+        against stored rows.
+        """
+        # object_type -> key -> (version, extracted record or None for a tombstone)
+        latest: Dict[str, Dict[Any, Tuple[Optional[int], Optional[Record]]]] = {}
+        received: Dict[str, int] = {}
+        counts: Dict[str, Dict[str, int]] = {}
+        for message in messages:
+            object_type = message.get("object_type")
+            spec = self.registry.get(object_type)
+            if spec is None:
+                raise ValueError(f"No processor found for object_type: {object_type}")
+            received[object_type] = received.get(object_type, 0) + 1
+            if message.get("event_type") == EVENT_TYPE_DELETE:
+                key = message.get(spec.key)
+                if key is None:
+                    raise ValueError(f"Delete event for {object_type} missing {spec.key}")
+                record = None
+                version = spec.delete_version(message)
+            else:
+                record = spec.extract(message)
+                key = record[spec.key_index]
+                version = record[spec.version_index] if spec.versioned else None
+            by_key = latest.setdefault(object_type, {})
+            current = by_key.get(key)
+            if current is None or version is None or current[0] is None or version > current[0]:
+                by_key[key] = (version, record)
+
+        for object_type, by_key in latest.items():
+            spec = self.registry.get(object_type)
+            records = [record for _, record in by_key.values() if record is not None]
+            keys = [key for key, (_, record) in by_key.items() if record is None]
+            versions = [version for version, record in by_key.values() if record is None]
+            upsert = spec.upsert_orm if self.write_path == WRITE_PATH_ORM else spec.upsert
+            applied = upsert(db, records) if records else 0
+            deleted = spec.soft_delete(db, keys, versions) if keys else 0
+            skipped = received[object_type] - applied - deleted
+            self._count(counts, object_type, applied=applied, deleted=deleted, skipped=skipped)
+            logger.info(
+                f"Wrote {object_type} batch: {applied} upserted, {deleted} tombstoned, "
+                f"{skipped} unchanged or superseded"
+            )
+        return counts
+
+    def record_committed(self, counts: Dict[str, Dict[str, int]]) -> None:
+        """Add the counts of a committed batch to the running totals"""
+        for object_type, batch_counts in counts.items():
+            self._count(self.stats, object_type, **batch_counts)
+
+    @staticmethod
+    def _count(counts: Dict[str, Dict[str, int]], object_type: str, **values: int) -> None:
+        entry = counts.setdefault(object_type, {"applied": 0, "deleted": 0, "skipped": 0})
+        for name, value in values.items():
+            entry[name] += value
     
-    def get_processor(self, object_type: str) -> Callable:
+    def get_processor(self, object_type: str) -> Optional[Any]:
         """Get the appropriate processor for the object type"""
-        return self.processors.get(object_type)
+        return self.processors.get(object_type) or self.registry.get(object_type)
     
     def register_processor(self, object_type: str, processor: Callable) -> None:
-        """Register a new processor for an object type"""
+        """Register a custom async processor, overriding the registry for that type"""
         self.processors[object_type] = processor
-    
-    async def _process_opportunity(self, message: Dict[str, Any], db: Session) -> None:
-        """Process an opportunity message"""
-        try:
-            repository = self.repositories["Opportunity"]
-            opportunity_data = {
-                "event_id": message.get("event_id", Opportunity.generate_event_id()),
-                "name": message.get("name"),
-                "stage": message.get("stage"),
-                "amount": message.get("amount"),
-                "probability": message.get("probability"),
-                "expected_close_date": message.get("expected_close_date"),
-                "account_id": message.get("account_id"),
-                "owner_id": message.get("owner_id"),
-                "metadata": message.get("metadata")
-            }
-            
-            existing = repository.get_by_event_id(db, opportunity_data["event_id"])
-            if existing:
-                repository.update(db, existing, opportunity_data)
-            else:
-                repository.create(db, opportunity_data)
-                
-            logger.info(f"Successfully processed opportunity: {opportunity_data['event_id']}")
-            
-        except Exception as e:
-            logger.error(f"Error processing opportunity: {str(e)}")
-            raise
-    
-    async def _process_project(self, message: Dict[str, Any], db: Session) -> None:
-        """Process a project message"""
-        try:
-            repository = self.repositories["Project"]
-            project_data = {
-                "event_id": message.get("event_id", Project.generate_event_id()),
-                "name": message.get("name"),
-                "status": message.get("status"),
-                "start_date": message.get("start_date"),
-                "end_date": message.get("end_date"),
-                "budget": message.get("budget"),
-                "is_active": message.get("is_active", True),
-                "manager_id": message.get("manager_id"),
-                "client_id": message.get("client_id"),
-                "metadata": message.get("metadata")
-            }
-            
-            existing = repository.get_by_event_id(db, project_data["event_id"])
-            if existing:
-                repository.update(db, existing, project_data)
-            else:
-                repository.create(db, project_data)
-                
-            logger.info(f"Successfully processed project: {project_data['event_id']}")
-            
-        except Exception as e:
-            logger.error(f"Error processing project: {str(e)}")
-            raise 
\ No newline at end of file
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Any
-from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
 from database.connection import Base
 
 class BaseModel(Base):
@@ -8,9 +8,12 @@ class BaseModel(Base):
     __abstract__ = True
 
     id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String, unique=True, index=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = Column(DateTime, nullable=True)
+    content_hash = Column(String(16), nullable=True)
+    source_version = Column(BigInteger, nullable=True)
 
     def dict(self) -> dict[str, Any]:
         """Convert model to dictionary"""
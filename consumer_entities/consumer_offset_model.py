@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from database.connection import Base
+
+class ConsumerOffset(Base):
+    """Next offset to consume per partition, written in the same transaction as the rows"""
+    __tablename__ = "consumer_offsets"
+
+    group_id = Column(String, primary_key=True)
+    topic = Column(String, primary_key=True)
+    partition = Column(Integer, primary_key=True)
+    next_offset = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def dict(self) -> dict:
+        """Convert model to dictionary"""
+        return {
+            column.name: getattr(self, column.name)
+            for column in self.__table__.columns
+            if getattr(self, column.name) is not None
+        }
+
+    def __repr__(self):
+        return f"<ConsumerOffset(topic='{self.topic}', partition={self.partition}, next_offset={self.next_offset})>"
@@ -1,8 +1,20 @@
-from sqlalchemy import Column, String, Float, Date, JSON
+from sqlalchemy import Column, String, Float, Date, JSON, Index, text
 from .base_model import BaseModel
 
+LIVE_ROWS = text("deleted_at IS NULL")
+
 class Opportunity(BaseModel):
     __tablename__ = "opportunities"
+    __table_args__ = (
+        # Partial indexes keep read queries off accumulated tombstones
+        Index("ix_opportunities_live_id", "id", sqlite_where=LIVE_ROWS, postgresql_where=LIVE_ROWS),
+        Index("ix_opportunities_live_account", "account_id", sqlite_where=LIVE_ROWS, postgresql_where=LIVE_ROWS),
+        Index("ix_opportunities_live_stage", "stage", sqlite_where=LIVE_ROWS, postgresql_where=LIVE_ROWS),
+        Index(
+            "ix_opportunities_tombstones", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"), postgresql_where=text("deleted_at IS NOT NULL")
+        ),
+    )
     
     name = Column(String, nullable=False)
     stage = Column(String, nullable=False)
@@ -14,4 +26,4 @@ class Opportunity(BaseModel):
     meta_data = Column(JSON, nullable=True)
     
     def __repr__(self):
-        return f"<Opportunity(name='{self.name}', stage='{self.stage}', amount={self.amount})>" 
\ No newline at end of file
+        return f"<Opportunity(name='{self.name}', stage='{self.stage}', amount={self.amount})>"
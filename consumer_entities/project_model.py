@@ -1,8 +1,20 @@
-from sqlalchemy import Column, String, Float, Date, Boolean, JSON
+from sqlalchemy import Column, String, Float, Date, Boolean, JSON, Index, text
 from .base_model import BaseModel
 
+LIVE_ROWS = text("deleted_at IS NULL")
+
 class Project(BaseModel):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Partial indexes keep read queries off accumulated tombstones
+        Index("ix_projects_live_id", "id", sqlite_where=LIVE_ROWS, postgresql_where=LIVE_ROWS),
+        Index("ix_projects_live_client", "client_id", sqlite_where=LIVE_ROWS, postgresql_where=LIVE_ROWS),
+        Index("ix_projects_live_status", "status", sqlite_where=LIVE_ROWS, postgresql_where=LIVE_ROWS),
+        Index(
+            "ix_projects_tombstones", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"), postgresql_where=text("deleted_at IS NOT NULL")
+        ),
+    )
     
     name = Column(String, nullable=False)
     status = Column(String, nullable=False)
@@ -15,4 +27,4 @@ class Project(BaseModel):
     meta_data = Column(JSON, nullable=True)
     
     def __repr__(self):
-        return f"<Project(name='{self.name}', status='{self.status}', budget={self.budget})>" 
\ No newline at end of file
+        return f"<Project(name='{self.name}', status='{self.status}', budget={self.budget})>"
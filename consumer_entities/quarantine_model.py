@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON, Index
+from database.connection import Base
+
+class QuarantinedMessage(Base):
+    """Message that could not be routed to a processor"""
+    __tablename__ = "quarantined_messages"
+    __table_args__ = (
+        Index("ix_quarantine_type_received", "object_type", "received_at"),
+        Index("ix_quarantine_source", "source_topic", "source_partition", "source_offset"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    object_type = Column(String, nullable=True)
+    reason = Column(String, nullable=False)
+    source_topic = Column(String, nullable=True)
+    source_partition = Column(Integer, nullable=True)
+    source_offset = Column(BigInteger, nullable=True)
+    payload = Column(JSON, nullable=False)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    replay_attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String, nullable=True)
+    replayed_at = Column(DateTime, nullable=True)
+
+    def dict(self) -> dict:
+        """Convert model to dictionary"""
+        return {
+            column.name: getattr(self, column.name)
+            for column in self.__table__.columns
+            if getattr(self, column.name) is not None
+        }
+
+    def __repr__(self):
+        return f"<QuarantinedMessage(object_type='{self.object_type}', reason='{self.reason}')>"
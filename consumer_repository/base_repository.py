@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Optional, List, Type, TypeVar
+from sqlalchemy.orm import Session
+from consumer_repository.interfaces.i_repository import IRepository
+from consumer_utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar('T')
+
+class BaseRepository(IRepository[T]):
+    """CRUD operations shared by all entity repositories"""
+    model: Type[T]
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.entity_name = self.model.__name__.lower()
+        logger.debug(f"Initialized {type(self).__name__}")
+
+    def create(self, db: Session, obj_in: dict) -> T:
+        logger.info(f"Creating new {self.entity_name}: {obj_in.get('name', 'Unknown')}")
+        db_obj = self.model(**obj_in)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        logger.info(f"Successfully created {self.entity_name} with ID: {db_obj.id}")
+        return db_obj
+    
+    def get(self, db: Session, id: int) -> Optional[T]:
+        logger.info(f"Fetching {self.entity_name} with ID: {id}")
+        return db.query(self.model).filter(self.model.id == id).first()
+    
+    def get_by_event_id(self, db: Session, event_id: str) -> Optional[T]:
+        logger.info(f"Fetching {self.entity_name} with event_id: {event_id}")
+        return db.query(self.model).filter(self.model.event_id == event_id).first()
+    
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100, include_deleted: bool = False) -> List[T]:
+        logger.info(f"Fetching all {self.entity_name} records with skip={skip}, limit={limit}")
+        query = db.query(self.model)
+        if not include_deleted:
+            # Matches the partial index on live rows
+            query = query.filter(self.model.deleted_at.is_(None))
+        return query.order_by(self.model.id).offset(skip).limit(limit).all()
+    
+    def update(self, db: Session, db_obj: T, obj_in: dict) -> T:
+        logger.info(f"Updating {self.entity_name} with ID: {db_obj.id}")
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        logger.info(f"Successfully updated {self.entity_name} with ID: {db_obj.id}")
+        return db_obj
+    
+    def delete(self, db: Session, id: int) -> bool:
+        """Soft-delete a record by setting deleted_at"""
+        logger.info(f"Attempting to delete {self.entity_name} with ID: {id}")
+        deleted = db.query(self.model).filter(
+            self.model.id == id,
+            self.model.deleted_at.is_(None)
+        ).update({self.model.deleted_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        if deleted:
+            logger.info(f"Successfully deleted {self.entity_name} with ID: {id}")
+            return True
+        logger.warning(f"{self.model.__name__} with ID: {id} not found for deletion")
+        return False
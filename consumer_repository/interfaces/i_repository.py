@@ -21,8 +21,8 @@ class IRepository(Generic[T], ABC):
         pass
     
     @abstractmethod
-    def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[T]:
-        """Get all records with pagination"""
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100, include_deleted: bool = False) -> List[T]:
+        """Get all records with pagination, excluding soft-deleted ones by default"""
         pass
     
     @abstractmethod
@@ -32,5 +32,5 @@ class IRepository(Generic[T], ABC):
     
     @abstractmethod
     def delete(self, db: Session, id: int) -> bool:
-        """Delete a record"""
+        """Soft-delete a record"""
         pass 
\ No newline at end of file
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from consumer_entities.consumer_offset_model import ConsumerOffset
+
+# (topic, partition); aiokafka's TopicPartition compares equal to it
+Partition = Tuple[str, int]
+
+class OffsetRepository:
+    """Consumer offsets stored next to the data they describe"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save(self, group_id: str, offsets: Dict[Partition, int]) -> None:
+        """Upsert next offsets in the caller's transaction; never moves one backwards.
+
+        Batches of one partition can commit out of order across lanes, so
+        each stored offset only ever grows.
+        """
+        if not offsets:
+            return
+        table = ConsumerOffset.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["group_id", "topic", "partition"],
+            set_={
+                "next_offset": func.max(table.c.next_offset, stmt.excluded.next_offset),
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        now = datetime.utcnow()
+        self.db.execute(stmt, [
+            {"group_id": group_id, "topic": topic, "partition": partition, "next_offset": offset, "updated_at": now}
+            for (topic, partition), offset in offsets.items()
+        ])
+
+    def get(self, group_id: str, topic: str, partition: int) -> Optional[int]:
+        row = self.db.get(ConsumerOffset, (group_id, topic, partition))
+        return row.next_offset if row is not None else None
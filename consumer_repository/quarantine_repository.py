@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Optional, List, Any, Dict, Tuple
+from sqlalchemy.orm import Session
+from consumer_entities.quarantine_model import QuarantinedMessage
+from consumer_utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class QuarantineRepository:
+    """Indexed store for messages that could not be processed"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(
+        self,
+        payload: Dict[str, Any],
+        reason: str,
+        object_type: Optional[str] = None,
+        topic: Optional[str] = None,
+        partition: Optional[int] = None,
+        offset: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> QuarantinedMessage:
+        return self.add_many([{
+            "payload": payload,
+            "reason": reason,
+            "object_type": object_type,
+            "topic": topic,
+            "partition": partition,
+            "offset": offset,
+            "error": error
+        }])[0]
+
+    def add_many(self, entries: List[Dict[str, Any]]) -> List[QuarantinedMessage]:
+        """Insert quarantine entries (keyword arguments of ``add``) in one transaction"""
+        db_objs = [
+            QuarantinedMessage(
+                object_type=entry.get("object_type"),
+                reason=entry["reason"],
+                source_topic=entry.get("topic"),
+                source_partition=entry.get("partition"),
+                source_offset=entry.get("offset"),
+                payload=entry["payload"],
+                last_error=entry.get("error")
+            )
+            for entry in entries
+        ]
+        self.db.add_all(db_objs)
+        self.db.flush()
+        # Read before the commit expires them, which would reload every row
+        described = [f"{db_obj.id} ({db_obj.object_type}, {db_obj.reason})" for db_obj in db_objs]
+        self.db.commit()
+        logger.info(f"Quarantined {len(db_objs)} messages with IDs: {', '.join(described)}")
+        return db_objs
+
+    def find(
+        self,
+        object_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        topic: Optional[str] = None,
+        partition: Optional[int] = None,
+        include_replayed: bool = False,
+        after_id: int = 0,
+        limit: int = 100
+    ) -> List[QuarantinedMessage]:
+        """Fetch quarantined messages matching the filters, ordered by ID"""
+        query = self.db.query(QuarantinedMessage).filter(QuarantinedMessage.id > after_id)
+        if object_type is not None:
+            query = query.filter(QuarantinedMessage.object_type == object_type)
+        if since is not None:
+            query = query.filter(QuarantinedMessage.received_at >= since)
+        if until is not None:
+            query = query.filter(QuarantinedMessage.received_at < until)
+        if topic is not None:
+            query = query.filter(QuarantinedMessage.source_topic == topic)
+        if partition is not None:
+            query = query.filter(QuarantinedMessage.source_partition == partition)
+        if not include_replayed:
+            query = query.filter(QuarantinedMessage.replayed_at.is_(None))
+        return query.order_by(QuarantinedMessage.id).limit(limit).all()
+
+    def mark_replayed(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        self.db.query(QuarantinedMessage).filter(
+            QuarantinedMessage.id.in_(ids)
+        ).update({QuarantinedMessage.replayed_at: datetime.utcnow()}, synchronize_session=False)
+        self.db.commit()
+        logger.info(f"Marked {len(ids)} quarantined messages as replayed")
+
+    def record_failure(self, db_obj: QuarantinedMessage, error: str) -> None:
+        self.record_failures([(db_obj, error)])
+
+    def record_failures(self, failures: List[Tuple[QuarantinedMessage, str]]) -> None:
+        """Count a failed replay attempt with its error on each entry, in one transaction"""
+        if not failures:
+            return
+        for db_obj, error in failures:
+            db_obj.replay_attempts = (db_obj.replay_attempts or 0) + 1
+            db_obj.last_error = error
+        self.db.add_all([db_obj for db_obj, _ in failures])
+        self.db.commit()
@@ -0,0 +1,49 @@
+from typing import Generic, List, Optional, Type, TypeVar
+from consumer_repository.base_repository import BaseRepository
+from consumer_utils.logger import setup_logger
+from database import ShardSet, shards as default_shards
+
+logger = setup_logger(__name__)
+
+T = TypeVar('T')
+
+class ShardedRepository(Generic[T]):
+    """Reads of an entity repository across every shard.
+
+    Rows are found by ``event_id``; ``id`` is only unique within a shard.
+    Lookups go to one shard when ``event_id`` is the shard key and fan out
+    otherwise. Listings read ``skip + limit`` rows from each shard and merge
+    them by creation time.
+    """
+
+    def __init__(self, repository_class: Type[BaseRepository[T]], shard_set: ShardSet = None):
+        self.repository_class = repository_class
+        self.shards = shard_set or default_shards
+
+    def get_by_event_id(self, event_id: str) -> Optional[T]:
+        if self.shards.key == "event_id":
+            candidates = [self.shards.for_key(event_id)]
+        else:
+            candidates = self.shards.shards
+        for shard in candidates:
+            db = shard.session_factory()
+            try:
+                row = self.repository_class(db).get_by_event_id(db, event_id)
+                if row is not None:
+                    return row
+            finally:
+                db.close()
+        return None
+
+    def get_all(self, skip: int = 0, limit: int = 100, include_deleted: bool = False) -> List[T]:
+        rows: List[T] = []
+        for shard in self.shards.shards:
+            db = shard.session_factory()
+            try:
+                rows.extend(self.repository_class(db).get_all(db, 0, skip + limit, include_deleted))
+            finally:
+                db.close()
+        if self.shards.sharded:
+            rows.sort(key=lambda row: (row.created_at, row.event_id))
+        logger.info(f"Merged {len(rows)} rows from {self.shards.count} shards")
+        return rows[skip:skip + limit]
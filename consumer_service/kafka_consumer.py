@@ -1,17 +1,22 @@
 import asyncio
+import base64
 import json
 import os
-from typing import Dict, Type, Any
-from datetime import datetime
+import socket
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
 
-from aiokafka import AIOKafkaConsumer
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, InterfaceError, ProgrammingError, StatementError
+
+from consumer_utils.adaptive_batch import AdaptiveBatchController
 from consumer_utils.logger import setup_logger
+from consumer_utils.payload_codecs import PayloadDecoder, SchemaRegistry
 from consumer_utils.retry_handler import async_retry
-from core.config import Settings
-from core.constants import (
+from consumer_utils.slow_message_tracer import SlowMessageTracer
+from consumer_utils.startup_timer import startup_timer
+from core.config_sample import settings
+from core.constants_sample import (
     KAFKA_TOPIC_SALES_EVENTS,
-    OBJECT_TYPE_OPPORTUNITY,
-    OBJECT_TYPE_PROJECT,
     DB_AUTO_OFFSET_RESET,
     MAX_RETRIES,
     RETRY_DELAY,
@@ -27,49 +32,129 @@ from core.constants import (
     SUCCESS_STOP_CONSUMER,
     SUCCESS_PROCESS_MESSAGE,
     SUCCESS_CANCEL_TASK,
-    UNIDENTIFIED_MESSAGES_FILE
+    QUARANTINE_REASON_MISSING_OBJECT_TYPE,
+    QUARANTINE_REASON_UNKNOWN_OBJECT_TYPE,
+    QUARANTINE_REASON_INVALID_PAYLOAD,
+    QUARANTINE_REASON_INVALID_FIELDS,
+    QUARANTINE_REASON_WRITE_FAILED,
+    CONTENT_TYPE_JSON
 )
-from database import SessionLocal
-from consumer_entities.opportunity_model import Opportunity
-from consumer_entities.project_model import Project
-from consumer_repository.opportunity_repository import OpportunityRepository
-from consumer_repository.project_repository import ProjectRepository
+from database import SessionLocal, shards
+from consumer_business.processing_service import ProcessingService
+from consumer_repository.offset_repository import OffsetRepository
+from consumer_repository.quarantine_repository import QuarantineRepository
+from consumer_service.lane_scheduler import Lane, WeightedFairScheduler
+from consumer_service.offset_watermarks import OffsetWatermarks
+from consumer_service.partition_state import PartitionState
+
+if TYPE_CHECKING:
+    from aiokafka import AIOKafkaConsumer, TopicPartition
 
 logger = setup_logger(__name__)
 
+# Computes the offsets to store with a batch, called just before its commit
+OffsetSource = Callable[[], Dict["TopicPartition", int]]
+
+# Driver messages for a parameter value it cannot bind (sqlite3, psycopg2)
+BIND_ERROR_MARKERS = ("Error binding parameter", "can't adapt type")
+
+def is_data_error(error: BaseException) -> bool:
+    """Whether a write failed because of the record itself, so retrying cannot help.
+
+    Constraint and data errors from the database, and values the binder
+    or the driver cannot bind, count; driver errors such as a locked or
+    unreachable database, or a missing table, do not.
+    """
+    if isinstance(error, (IntegrityError, DataError)):
+        return True
+    if isinstance(error, (ProgrammingError, InterfaceError)):
+        return any(marker in str(error.orig) for marker in BIND_ERROR_MARKERS)
+    if isinstance(error, StatementError):
+        # Raised by SQLAlchemy itself, e.g. a value its bind processor rejects
+        return not isinstance(error, DBAPIError)
+    return isinstance(error, (TypeError, ValueError, OverflowError))
+
 class KafkaConsumerService:
     """Kafka consumer service for processing enterprise objects"""
     
     def __init__(self):
-        self.settings = Settings()
-        self.consumer: AIOKafkaConsumer = None
+        self.settings = settings
+        self.consumer: Optional["AIOKafkaConsumer"] = None
         self.is_running = False
         self.consume_task = None
-        self.object_processors: Dict[str, Type] = {
-            OBJECT_TYPE_OPPORTUNITY: Opportunity,
-            OBJECT_TYPE_PROJECT: Project
-        }
-        self.repositories = {
-            OBJECT_TYPE_OPPORTUNITY: OpportunityRepository,
-            OBJECT_TYPE_PROJECT: ProjectRepository
-        }
-        # Ensure logs directory exists
-        os.makedirs(os.path.dirname(UNIDENTIFIED_MESSAGES_FILE), exist_ok=True)
+        self.processing_service = ProcessingService(write_path=self.settings.WRITE_PATH)
+        self.payload_decoder = PayloadDecoder(
+            SchemaRegistry(self.settings.SCHEMA_REGISTRY_DIR),
+            self.processing_service.registry.payload_keys() | {"object_type", "event_type"}
+        )
+        # Each shard file has its own writer; unsharded, the main database is the only shard
+        self.shards = shards
+        self.lane_scheduler = WeightedFairScheduler.from_config(
+            self.settings.CONSUMER_LANES, quantum=self.settings.LANE_QUANTUM
+        )
+        # Notified when messages are queued, a lane batch finishes or a drain ends
+        self._lanes_changed = asyncio.Condition()
+        self._lane_tasks: Set[asyncio.Task] = set()
+        # Lane batches holding a slot; released before the dispatcher is notified
+        self._lane_batches = 0
+        self._draining = 0
+        # Failed lane batch attempts per (topic, partition, offset)
+        self._write_attempts: Dict[Tuple[str, int, int], int] = {}
+        # Offsets fetched but not yet written, so commits never skip them
+        self.watermarks = OffsetWatermarks()
+        self.partition_state: Dict["TopicPartition", PartitionState] = {}
+        self.batch_controller = AdaptiveBatchController(
+            initial_size=self.settings.KAFKA_MAX_POLL_RECORDS,
+            min_size=self.settings.BATCH_MIN_SIZE,
+            max_size=self.settings.BATCH_MAX_SIZE,
+            target_latency_ms=self.settings.BATCH_TARGET_COMMIT_LATENCY_MS,
+            increase_step=self.settings.BATCH_INCREASE_STEP,
+            decrease_factor=self.settings.BATCH_DECREASE_FACTOR,
+            max_error_rate=self.settings.BATCH_MAX_ERROR_RATE,
+            min_linger_ms=self.settings.BATCH_MIN_LINGER_MS,
+            max_linger_ms=self.settings.BATCH_MAX_LINGER_MS,
+            linger_step_ms=self.settings.BATCH_LINGER_STEP_MS,
+            enabled=self.settings.ADAPTIVE_BATCHING_ENABLED
+        )
+        self.slow_message_tracer = SlowMessageTracer(
+            self.settings.SLOW_MESSAGE_THRESHOLD_MS,
+            self.settings.SLOW_MESSAGE_BUFFER_SIZE
+        )
         logger.info("KafkaConsumerService initialized")
 
+    def group_instance_id(self) -> Optional[str]:
+        """Static membership ID, stable across restarts of the same pod"""
+        if self.settings.KAFKA_GROUP_INSTANCE_ID:
+            return self.settings.KAFKA_GROUP_INSTANCE_ID
+        if self.settings.KAFKA_STATIC_MEMBERSHIP:
+            return os.environ.get("HOSTNAME") or socket.gethostname()
+        return None
+
+    def topics(self) -> List[str]:
+        """Topics to subscribe to, from KAFKA_TOPICS or the sales events topic"""
+        topics = [topic.strip() for topic in self.settings.KAFKA_TOPICS.split(",") if topic.strip()]
+        return topics or [KAFKA_TOPIC_SALES_EVENTS]
+
     async def start(self):
         """Start the Kafka consumer"""
+        # Imported here so the HTTP app and schema check do not wait on it
+        from aiokafka import AIOKafkaConsumer
+        from consumer_service.rebalance_listener import DrainingRebalanceListener
+
         try:
-            # For development, use only sales_events topic
-            topics = [KAFKA_TOPIC_SALES_EVENTS]
-            logger.info(f"Starting Kafka consumer with topics: {topics}")
+            topics = self.topics()
+            group_instance_id = self.group_instance_id()
+            logger.info(f"Starting Kafka consumer with topics: {topics}, group_instance_id: {group_instance_id}")
             self.consumer = AIOKafkaConsumer(
-                *topics,
                 bootstrap_servers=self.settings.KAFKA_BOOTSTRAP_SERVERS,
                 group_id=self.settings.KAFKA_GROUP_ID,
+                group_instance_id=group_instance_id,
+                session_timeout_ms=self.settings.KAFKA_SESSION_TIMEOUT_MS,
                 auto_offset_reset=DB_AUTO_OFFSET_RESET,
-                value_deserializer=lambda m: m.decode('utf-8') if m else None
+                enable_auto_commit=False,
+                max_poll_records=self.settings.BATCH_MAX_SIZE
             )
+            self.consumer.subscribe(topics, listener=DrainingRebalanceListener(self))
             await self.consumer.start()
             self.is_running = True
             logger.info(SUCCESS_START_CONSUMER)
@@ -93,101 +178,459 @@ class KafkaConsumerService:
                     await self.consume_task
                 except asyncio.CancelledError:
                     pass
+            # Queued messages are left uncommitted and will be redelivered
+            await self._wait_for_lane_batches()
+            await self.commit_pending()
             await self.consumer.stop()
             logger.info(SUCCESS_STOP_CONSUMER)
 
-    def parse_message(self, message_value: str) -> Dict[str, Any]:
-        """Parse stringified JSON message"""
+    async def commit_pending(self, partitions: Optional[Iterable["TopicPartition"]] = None) -> None:
+        """Commit each partition's watermark, optionally for some partitions only"""
+        offsets = {}
+        for tp in self.watermarks.partitions() if partitions is None else partitions:
+            offset = self.watermarks.committable(tp)
+            state = self.partition_state.get(tp)
+            if offset is None or (state is not None and state.committed_offset == offset):
+                continue
+            offsets[tp] = offset
+        if not offsets:
+            return
+        try:
+            await self.consumer.commit(offsets)
+        except Exception as e:
+            # The messages will be redelivered; the upserts are idempotent
+            logger.warning(f"Offset commit failed for {sorted(str(tp) for tp in offsets)}: {str(e)}")
+            return
+        for tp, offset in offsets.items():
+            if tp in self.partition_state:
+                self.partition_state[tp].committed_offset = offset
+
+    async def drain_partitions(self, revoked: Iterable["TopicPartition"]) -> None:
+        """Wait for in-flight lane batches, then commit and drop revoked partitions.
+
+        Queued messages of revoked partitions are discarded; the commit stops
+        below them so the new owner receives them again.
+        """
+        revoked = list(revoked)
+        self._draining += 1
+        try:
+            await self._wait_for_lane_batches()
+            dropped = self.lane_scheduler.drop(revoked)
+            if dropped:
+                logger.info(f"Dropped {dropped} queued messages of revoked partitions")
+            await self.commit_pending(revoked)
+        finally:
+            self._draining -= 1
+            await self._notify_lanes()
+        self.watermarks.forget(revoked)
+        for tp in revoked:
+            self.partition_state.pop(tp, None)
+        revoked_keys = {(tp.topic, tp.partition) for tp in revoked}
+        for key in [key for key in self._write_attempts if key[:2] in revoked_keys]:
+            del self._write_attempts[key]
+
+    async def warm_partitions(self, assigned: Iterable["TopicPartition"]) -> None:
+        """Load committed offsets and warm a database connection for new partitions.
+
+        With the offset store enabled, partitions whose stored offset is ahead
+        of Kafka's (the process stopped between the database commit and the
+        offset commit) are sought to the stored offset, so nothing is written
+        twice.
+        """
+        assigned = [tp for tp in assigned if tp not in self.partition_state]
+        stored = {}
+        if self.settings.OFFSET_STORE_ENABLED and assigned:
+            stored = await asyncio.to_thread(self._load_stored_offsets, assigned)
+        for tp in assigned:
+            state = PartitionState(await self.consumer.committed(tp))
+            offset = stored.get(tp)
+            if offset is not None and (state.committed_offset is None or offset > state.committed_offset):
+                self.consumer.seek(tp, offset)
+                state.restored_offset = offset
+                logger.info(f"Resuming {tp} from stored offset {offset} (Kafka committed: {state.committed_offset})")
+            self.partition_state[tp] = state
+        await asyncio.to_thread(self._warm_database)
+
+    def _load_stored_offsets(self, partitions: List["TopicPartition"]) -> Dict["TopicPartition", int]:
+        """Stored offsets of partitions; with shards, the lowest one every shard has reached"""
+        offsets: Dict["TopicPartition", int] = {}
+        missing: Set["TopicPartition"] = set()
+        for shard in self.shards.shards:
+            db = shard.session_factory()
+            try:
+                repository = OffsetRepository(db)
+                for tp in partitions:
+                    offset = repository.get(self.settings.KAFKA_GROUP_ID, tp.topic, tp.partition)
+                    if offset is None:
+                        # A shard that never saw this partition cannot vouch for any offset
+                        missing.add(tp)
+                    else:
+                        offsets[tp] = min(offset, offsets.get(tp, offset))
+            finally:
+                db.close()
+        return {tp: offset for tp, offset in offsets.items() if tp not in missing}
+
+    def _warm_database(self) -> None:
+        for shard in self.shards.shards:
+            with shard.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+
+    def parse_message(self, message_value: Any, headers=None) -> Dict[str, Any]:
+        """Parse a message value in the format named by its content-type header"""
         try:
             if not message_value:
                 raise ValueError("Empty message received")
             
-            # Parse the stringified JSON
-            return json.loads(message_value)
+            # JSON unless the headers select a binary format
+            return self.payload_decoder.decode(message_value, headers)
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON message: {message_value}")
+            logger.error(f"Failed to parse JSON message: {message_value!r}")
             raise ValueError(f"Invalid JSON format: {str(e)}")
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error parsing message: {str(e)}")
-            raise
+            raise ValueError(f"Invalid payload: {str(e)}")
 
-    def store_unidentified_message(self, message: Dict[str, Any]):
-        """Store unidentified message in a separate file"""
+    @staticmethod
+    def _raw_payload(value: Any) -> Dict[str, Any]:
+        """JSON-safe representation of an undecodable message value"""
+        if isinstance(value, (bytes, bytearray)):
+            try:
+                return {"raw": bytes(value).decode("utf-8")}
+            except UnicodeDecodeError:
+                return {"raw_base64": base64.b64encode(value).decode("ascii")}
+        return {"raw": value}
+
+    def _quarantine_payload(self, message: Any, source) -> Any:
+        """Full, JSON-safe payload to quarantine for a message"""
+        headers = getattr(source, "headers", None)
+        if source is not None and self.payload_decoder.content_type(headers) != CONTENT_TYPE_JSON:
+            # Binary readers only materialize mapped fields; keep everything
+            try:
+                message = self.payload_decoder.decode(source.value, headers, full=True)
+            except Exception:
+                return self._raw_payload(source.value)
+        return json.loads(json.dumps(message, default=str))
+
+    def quarantine_entry(self, message: Any, reason: str, source=None, error: Optional[str] = None) -> Dict[str, Any]:
+        """Quarantine table entry for an unidentified message, see ``QuarantineRepository.add``"""
+        return {
+            "payload": self._quarantine_payload(message, source),
+            "reason": reason,
+            "object_type": message.get("object_type") if isinstance(message, dict) else None,
+            "topic": getattr(source, "topic", None),
+            "partition": getattr(source, "partition", None),
+            "offset": getattr(source, "offset", None),
+            "error": error
+        }
+
+    async def store_quarantined(self, entries: List[Dict[str, Any]]) -> None:
+        """Insert quarantine entries in one transaction, off the event loop.
+
+        Raises when the insert fails; callers keep the messages' offsets
+        pending so they are fetched and quarantined again.
+        """
+        if not entries:
+            return
+        await asyncio.to_thread(self._add_quarantined, entries)
+
+    def _add_quarantined(self, entries: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
         try:
-            # Add timestamp to the message
-            message_with_timestamp = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": message
-            }
-            
-            # Append the message to the unidentified messages file
-            with open(UNIDENTIFIED_MESSAGES_FILE, 'a') as f:
-                f.write(json.dumps(message_with_timestamp) + '\n')
-                
-            logger.info(f"Stored unidentified message in {UNIDENTIFIED_MESSAGES_FILE}")
-        except Exception as e:
-            logger.error(f"Failed to store unidentified message: {str(e)}")
+            QuarantineRepository(db).add_many(entries)
+        finally:
+            db.close()
 
-    @async_retry(max_retries=MAX_RETRIES, delay=RETRY_DELAY)
-    async def process_message(self, message):
-        """Process a single Kafka message"""
+    def can_process(self, object_type: str) -> bool:
+        """Check whether a processor is registered for the object type"""
+        return self.processing_service.get_processor(object_type) is not None
+
+    def decode_message(self, message, quarantined: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Decode a Kafka message; payloads that cannot be parsed are added to ``quarantined``"""
         try:
-            logger.info(f"Processing message from topic {message.topic}, partition {message.partition}, offset {message.offset}")
-            
-            # Parse the stringified JSON message
-            data = self.parse_message(message.value)
-            logger.info(f"Parsed message data: {json.dumps(data)}")
-            
-            if not isinstance(data, dict):
+            data = self.parse_message(message.value, getattr(message, "headers", None))
+        except ValueError as e:
+            logger.error(ERROR_DECODE_MESSAGE.format(str(e)))
+            quarantined.append(self.quarantine_entry(self._raw_payload(message.value), QUARANTINE_REASON_INVALID_PAYLOAD, message))
+            return None
+        logger.info(f"Parsed message data: {json.dumps(data, default=str)}")
+        return data
+
+    def route(self, data: Any, source=None, quarantined: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """Check that a decoded message has a processor.
+
+        Unidentified messages are added to ``quarantined`` for the caller to
+        store, or rejected with ``ValueError`` without it (used when
+        replaying the quarantine).
+        """
+        if not isinstance(data, dict):
+            if quarantined is None:
                 raise ValueError(f"Expected dict, got {type(data)}")
-            
-            object_type = data.get("object_type")
-            if not object_type:
-                logger.warning(ERROR_MISSING_OBJECT_TYPE.format(json.dumps(data)))
-                self.store_unidentified_message(data)
-                return
-            
-            if object_type not in self.object_processors:
-                logger.warning(ERROR_UNKNOWN_OBJECT.format(object_type))
-                self.store_unidentified_message(data)
-                return
-            
-            model_class = self.object_processors[object_type]
-            repository_class = self.repositories[object_type]
-            
-            # Create database session
-            db = SessionLocal()
+            quarantined.append(self.quarantine_entry({"raw": data}, QUARANTINE_REASON_INVALID_PAYLOAD, source))
+            return False
+        
+        object_type = data.get("object_type")
+        if not object_type:
+            logger.warning(ERROR_MISSING_OBJECT_TYPE.format(json.dumps(data, default=str)))
+            if quarantined is None:
+                raise ValueError("Message missing object_type")
+            quarantined.append(self.quarantine_entry(data, QUARANTINE_REASON_MISSING_OBJECT_TYPE, source))
+            return False
+        
+        if not self.can_process(object_type):
+            logger.warning(ERROR_UNKNOWN_OBJECT.format(object_type))
+            if quarantined is None:
+                raise ValueError(f"No processor for object_type: {object_type}")
+            quarantined.append(self.quarantine_entry(data, QUARANTINE_REASON_UNKNOWN_OBJECT_TYPE, source))
+            return False
+        return True
+
+    def validate_routed(
+        self,
+        routed: List[Tuple[Any, Dict[str, Any]]],
+        quarantined: Optional[List[Dict[str, Any]]] = None
+    ) -> Set[int]:
+        """Coerce the fields of routed messages for the whole batch.
+
+        Invalid messages are added to ``quarantined`` with the validation
+        error so the rest of the batch can still be written, or rejected with
+        ``ValueError`` without it. Returns their indexes.
+        """
+        errors = self.processing_service.validate_batch([data for _, data in routed])
+        for index, error in errors.items():
+            source, data = routed[index]
+            logger.warning(f"Invalid {data.get('object_type')} message: {error}")
+            if quarantined is None:
+                raise ValueError(f"Invalid message: {error}")
+            quarantined.append(self.quarantine_entry(data, QUARANTINE_REASON_INVALID_FIELDS, source, error=error))
+        return set(errors)
+
+    @async_retry(max_retries=MAX_RETRIES, delay=RETRY_DELAY)
+    async def write_batch(
+        self,
+        records: List[Dict[str, Any]],
+        timings: Optional[Dict[str, float]] = None,
+        offsets: Optional[OffsetSource] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """``write_records`` with retries and backoff"""
+        return await self.write_records(records, timings, offsets)
+
+    async def write_records(
+        self,
+        records: List[Dict[str, Any]],
+        timings: Optional[Dict[str, float]] = None,
+        offsets: Optional[OffsetSource] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """Write routed records in a single transaction per shard, in one attempt.
+
+        When ``timings`` is given, the time spent in the write and the commit
+        of the last attempt is stored in it, in seconds. ``offsets`` is called
+        after the records are written and its result saved to the offset store
+        in the same transaction, so it sees batches committed meanwhile.
+
+        With sharded storage the shards are written concurrently, each in its
+        own transaction, and every shard stores the offsets. A failed shard
+        fails the batch; the retry rewrites all of it, which is safe because
+        the upserts are idempotent.
+        """
+        groups = self.shards.split(records)
+        if offsets is not None:
+            for index in range(self.shards.count):
+                groups.setdefault(index, [])
+        results = await asyncio.gather(
+            *(self._write_shard(index, group, offsets) for index, group in groups.items()),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error(ERROR_PROCESS_MESSAGE.format(str(result)))
+                raise result
+        counts: Dict[str, Dict[str, int]] = {}
+        for shard_counts, _, _ in results:
+            for object_type, batch_counts in shard_counts.items():
+                totals = counts.setdefault(object_type, {})
+                for key, value in batch_counts.items():
+                    totals[key] = totals.get(key, 0) + value
+        if timings is not None:
+            # Shards run side by side, so the slowest one is the batch's time
+            timings["db_write"] = max((result[1] for result in results), default=0.0)
+            timings["db_commit"] = max((result[2] for result in results), default=0.0)
+        self.processing_service.record_committed(counts)
+        for object_type, batch_counts in counts.items():
+            logger.info(SUCCESS_PROCESS_MESSAGE.format(f"{object_type} {batch_counts}"))
+        return counts
+
+    async def _write_shard(
+        self,
+        index: int,
+        records: List[Dict[str, Any]],
+        offsets: Optional[OffsetSource]
+    ) -> Tuple[Dict[str, Dict[str, int]], float, float]:
+        """Write one shard's records and offsets; returns counts, write and commit seconds"""
+        db = self.shards.shards[index].session_factory()
+        try:
+            started = time.perf_counter()
+            counts = await self.processing_service.process_batch(records, db) if records else {}
+            if offsets is not None:
+                await asyncio.to_thread(OffsetRepository(db).save, self.settings.KAFKA_GROUP_ID, offsets())
+            written = time.perf_counter()
+            await asyncio.to_thread(db.commit)
+        finally:
+            db.close()
+        return counts, written - started, time.perf_counter() - written
+
+    def _decode_and_route(
+        self,
+        message,
+        quarantined: List[Dict[str, Any]]
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, float]]:
+        """Decode and route one Kafka message; returns the routed data or None"""
+        started = time.perf_counter()
+        logger.info(f"Processing message from topic {message.topic}, partition {message.partition}, offset {message.offset}")
+        data = self.decode_message(message, quarantined)
+        decoded = time.perf_counter()
+        routed = data is not None and self.route(data, source=message, quarantined=quarantined)
+        stages = {"decode": decoded - started, "route": time.perf_counter() - decoded}
+        return (data if routed else None), stages
+
+    @staticmethod
+    def _object_type(data: Any) -> Optional[str]:
+        return data.get("object_type") if isinstance(data, dict) else None
+
+    def _trace(self, message, data: Any, stages: Dict[str, float]) -> None:
+        """Trace a message's own stages; shared stages go to ``_trace_batch``"""
+        self.slow_message_tracer.record(message, self._object_type(data), stages)
+
+    def _trace_batch(self, traced: List[Tuple[Any, Any]], stages: Dict[str, float], lane: Optional[str] = None) -> None:
+        """Trace the stages a batch of (message, data) pairs shared, once for the batch"""
+        self.slow_message_tracer.record_batch(
+            [message for message, _ in traced], [self._object_type(data) for _, data in traced], stages, lane
+        )
+
+    async def process_message(self, message):
+        """Queue a single Kafka message into its lane, like a fetch of one message"""
+        from aiokafka import TopicPartition
+
+        await self.enqueue_batch({TopicPartition(message.topic, message.partition): [message]})
+
+    async def handle_batch(self, messages: List[Any]) -> Dict[int, str]:
+        """Route, validate and write already decoded messages without quarantining them.
+
+        Valid messages are written together in one ``write_batch``. When that
+        fails, each is written on its own so one bad record does not hold
+        back the others. Returns the error of every message that was not
+        written, by index.
+        """
+        errors: Dict[int, str] = {}
+        routed = []
+        for index, data in enumerate(messages):
             try:
-                # Create repository instance with database session
-                repository = repository_class(db)
-                logger.info(f"Created repository instance for {object_type}")
-                
-                # Process the message
-                await repository.process_message(data)
-                
-                # Commit transaction
-                db.commit()
-                logger.info(SUCCESS_PROCESS_MESSAGE.format(object_type))
-            except Exception as e:
-                db.rollback()
-                logger.error(ERROR_PROCESS_MESSAGE.format(str(e)))
-                raise
-            finally:
-                db.close()
-                
+                self.route(data)
+            except ValueError as e:
+                errors[index] = str(e)
+                continue
+            routed.append(index)
+        invalid = self.processing_service.validate_batch([messages[index] for index in routed])
+        for position, error in invalid.items():
+            errors[routed[position]] = f"Invalid message: {error}"
+        valid = [index for position, index in enumerate(routed) if position not in invalid]
+        if not valid:
+            return errors
+        try:
+            await self.write_batch([messages[index] for index in valid])
         except Exception as e:
-            logger.error(ERROR_DECODE_MESSAGE.format(str(e)))
-            raise
+            logger.warning(f"Batch of {len(valid)} messages failed, writing them one by one: {str(e)}")
+            for index in valid:
+                try:
+                    await self.write_records([messages[index]])
+                except Exception as e:
+                    errors[index] = str(e)
+        return errors
+
+    async def fetch_batch(self) -> Dict["TopicPartition", List[Any]]:
+        """Fetch up to the controller's batch size, lingering to fill it"""
+        max_records = self.batch_controller.batch_size
+        batches = await self.consumer.getmany(
+            timeout_ms=self.settings.KAFKA_POLL_TIMEOUT_MS,
+            max_records=max_records
+        )
+        fetched = sum(len(partition_messages) for partition_messages in batches.values())
+        linger_ms = int(self.batch_controller.linger_ms)
+        if 0 < fetched < max_records and linger_ms > 0:
+            more = await self.consumer.getmany(timeout_ms=linger_ms, max_records=max_records - fetched)
+            for tp, partition_messages in more.items():
+                batches.setdefault(tp, []).extend(partition_messages)
+        return batches
+
+    async def enqueue_batch(self, batches: Dict["TopicPartition", List[Any]]) -> None:
+        """Decode, route and validate fetched messages into their lanes"""
+        # Track the whole fetch first, so a failure part way through leaves it pending
+        for tp, partition_messages in batches.items():
+            for message in partition_messages:
+                self.watermarks.track(tp, message.offset)
+        quarantined: List[Dict[str, Any]] = []
+        routed = []
+        unroutable = []
+        for tp, partition_messages in batches.items():
+            for message in partition_messages:
+                data, stages = self._decode_and_route(message, quarantined)
+                if data is None:
+                    unroutable.append((tp, message, stages))
+                    continue
+                routed.append((message, data, stages))
+
+        started = time.perf_counter()
+        invalid = self.validate_routed([(message, data) for message, data, _ in routed], quarantined)
+        validated = time.perf_counter() - started
+        # One insert for the whole fetch, before any of it is handed off: if it
+        # fails, the fetch is rewound with its offsets still pending
+        await self.store_quarantined(quarantined)
+        for tp, message, stages in unroutable:
+            # Quarantined: nothing left to write
+            self.watermarks.complete(tp, message.offset)
+            self._trace(message, None, stages)
+        self._trace_batch([(message, data) for message, data, _ in routed], {"validate": validated})
+        for index, (message, data, stages) in enumerate(routed):
+            if index in invalid:
+                self.watermarks.complete((message.topic, message.partition), message.offset)
+                self._trace(message, data, stages)
+                continue
+            lane = self.lane_scheduler.classify(data.get("object_type"), message.topic)
+            self.lane_scheduler.enqueue(lane, message, data, stages)
+        await self._notify_lanes()
+
+    async def _notify_lanes(self) -> None:
+        async with self._lanes_changed:
+            self._lanes_changed.notify_all()
+
+    def _has_room(self) -> bool:
+        return not self.is_running or self.lane_scheduler.queued() < self.settings.LANE_MAX_QUEUED_MESSAGES
+
+    async def _wait_for_lane_batches(self) -> None:
+        while self._lane_tasks:
+            await asyncio.gather(*list(self._lane_tasks), return_exceptions=True)
 
     async def consume(self):
-        """Consume messages from Kafka"""
+        """Fetch messages into the lanes and commit their watermarks.
+
+        Writing happens in ``dispatch``; fetching pauses while the lanes hold
+        LANE_MAX_QUEUED_MESSAGES so memory stays bounded under a flood.
+        """
+        dispatcher = asyncio.create_task(self.dispatch())
         try:
             while self.is_running:
                 try:
-                    async for message in self.consumer:
-                        if not self.is_running:
-                            break
-                        await self.process_message(message)
+                    await self.commit_pending()
+                    async with self._lanes_changed:
+                        await self._lanes_changed.wait_for(self._has_room)
+                    batches = await self.fetch_batch()
+                    if batches:
+                        try:
+                            await self.enqueue_batch(batches)
+                        except Exception:
+                            self._rewind(batches)
+                            raise
                 except asyncio.CancelledError:
                     logger.info(SUCCESS_CANCEL_TASK)
                     break
@@ -197,4 +640,167 @@ class KafkaConsumerService:
                         await asyncio.sleep(RETRY_DELAY)  # Wait before retrying
         except Exception as e:
             logger.error(ERROR_FATAL.format(str(e)))
-            raise 
\ No newline at end of file
+            raise
+        finally:
+            dispatcher.cancel()
+            try:
+                await dispatcher
+            except asyncio.CancelledError:
+                pass
+
+    def _rewind(self, batches: Dict["TopicPartition", List[Any]]) -> None:
+        """Seek back to the start of a fetch that never reached the lanes.
+
+        Its offsets stay pending in the watermarks, so nothing is committed
+        past them; the messages are fetched and enqueued again.
+        """
+        for tp, partition_messages in batches.items():
+            if partition_messages and tp in self.partition_state:
+                self.consumer.seek(tp, partition_messages[0].offset)
+                logger.warning(f"Rewound {tp} to offset {partition_messages[0].offset} after a failed fetch")
+
+    def _pick_lane_batch(self) -> Optional[Tuple[Lane, List[Any], int]]:
+        if self._draining or self._lane_batches >= self.settings.LANE_MAX_CONCURRENT_BATCHES:
+            return None
+        return self.lane_scheduler.next_batch(self.batch_controller.batch_size)
+
+    async def dispatch(self):
+        """Start lane batches in the order chosen by the weighted fair scheduler"""
+        while True:
+            async with self._lanes_changed:
+                picked = self._pick_lane_batch()
+                while picked is None:
+                    await self._lanes_changed.wait()
+                    picked = self._pick_lane_batch()
+            self.start_lane_batch(*picked)
+
+    def start_lane_batch(self, lane: Lane, items: List[Any], limit: Optional[int] = None) -> asyncio.Task:
+        """Mark a picked lane batch in flight and write it in a task"""
+        self._lane_batches += 1
+        lane.in_flight += 1
+        for _, message, _, _ in items:
+            tp = (message.topic, message.partition)
+            lane.busy_partitions[tp] = lane.busy_partitions.get(tp, 0) + 1
+        task = asyncio.create_task(self.write_lane_batch(lane, items, limit))
+        self._lane_tasks.add(task)
+        task.add_done_callback(self._lane_tasks.discard)
+        return task
+
+    def _offset_source(self, items: List[Any]) -> Optional[OffsetSource]:
+        if not self.settings.OFFSET_STORE_ENABLED:
+            return None
+        return lambda: self._stored_offsets(items)
+
+    def _stored_offsets(self, items: List[Any]) -> Dict[Any, int]:
+        """Offsets to store with a lane batch: each partition's watermark once it is written.
+
+        A batch of another lane for the same partition that is still in
+        flight holds this value back, so the stored offset can trail the
+        written rows until a later batch stores a higher one.
+        """
+        by_partition: Dict[Any, List[int]] = {}
+        for _, message, _, _ in items:
+            by_partition.setdefault((message.topic, message.partition), []).append(message.offset)
+        offsets = {}
+        for tp, partition_offsets in by_partition.items():
+            offset = self.watermarks.committable_after(tp, partition_offsets)
+            if offset is not None:
+                offsets[tp] = offset
+        return offsets
+
+    def _count_failed_attempt(self, items: List[Any]) -> int:
+        """Count a failed attempt for each item; returns the most attempts of any item"""
+        attempts = 0
+        for _, message, _, _ in items:
+            key = (message.topic, message.partition, message.offset)
+            self._write_attempts[key] = self._write_attempts.get(key, 0) + 1
+            attempts = max(attempts, self._write_attempts[key])
+        return attempts
+
+    async def _write_individually(self, items: List[Any]) -> List[Any]:
+        """Write a failing batch one record at a time, quarantining records with data errors.
+
+        Stops at the first record that fails for another reason, such as a
+        locked or unavailable database, or whose quarantine insert fails.
+        Returns that record and the ones after it, to retry in order.
+        """
+        for position, item in enumerate(items):
+            _, message, data, _ = item
+            try:
+                await self.write_records([data], offsets=self._offset_source([item]))
+            except Exception as e:
+                if not is_data_error(e):
+                    logger.warning(f"Keeping {message.topic}[{message.partition}]@{message.offset} pending after a transient error: {str(e)}")
+                    return items[position:]
+                logger.error(f"Quarantining {message.topic}[{message.partition}]@{message.offset} after failed writes: {str(e)}")
+                try:
+                    await self.store_quarantined([self.quarantine_entry(data, QUARANTINE_REASON_WRITE_FAILED, message, error=str(e))])
+                except Exception as quarantine_error:
+                    logger.error(f"Failed to quarantine {message.topic}[{message.partition}]@{message.offset}: {str(quarantine_error)}")
+                    return items[position:]
+        return []
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Exponential backoff before a failed lane batch is retried"""
+        return min(RETRY_DELAY * 2 ** (attempts - 1), self.settings.MAX_RETRY_DELAY)
+
+    async def write_lane_batch(self, lane: Lane, items: List[Any], limit: Optional[int] = None) -> None:
+        """Write one lane batch; failed batches go back to the front of the lane.
+
+        After LANE_MAX_BATCH_ATTEMPTS failed attempts the records are written
+        one by one and those with data errors are quarantined, so one bad
+        record cannot block its partition. Records that fail for other
+        reasons stay pending and are retried with backoff. ``limit`` is how
+        many items the scheduler allowed; the batch controller judges fill
+        against it.
+        """
+        dispatched = time.monotonic()
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        written = items
+        isolated = False
+        try:
+            await self.write_batch([data for _, _, data, _ in items], timings=timings, offsets=self._offset_source(items))
+        except Exception as e:
+            self.batch_controller.observe(len(items), time.perf_counter() - started, failed=True, capacity=limit)
+            lane.record([], failed=True)
+            logger.error(ERROR_CONSUME_LOOP.format(f"lane {lane.name}: {str(e)}"))
+            attempts = self._count_failed_attempt(items)
+            pending = items
+            if attempts >= self.settings.LANE_MAX_BATCH_ATTEMPTS:
+                pending = await self._write_individually(items)
+            if pending:
+                # Keep the offsets pending and retry in order after a pause
+                await asyncio.sleep(self._retry_delay(attempts))
+                lane.queue.extendleft(reversed(pending))
+            written = items[:len(items) - len(pending)]
+            isolated = True
+        finally:
+            # The task is still in _lane_tasks here, so the slot is released by count
+            self._lane_batches -= 1
+            lane.in_flight -= 1
+            for _, message, _, _ in items:
+                tp = (message.topic, message.partition)
+                lane.busy_partitions[tp] -= 1
+                if not lane.busy_partitions[tp]:
+                    del lane.busy_partitions[tp]
+            await self._notify_lanes()
+
+        if not written:
+            return
+        if not isolated:
+            self.batch_controller.observe(
+                len(items), timings.get("db_write", 0.0) + timings.get("db_commit", 0.0), capacity=limit
+            )
+        finished = time.monotonic()
+        lane.record([(finished - enqueued_at) * 1000 for enqueued_at, _, _, _ in written])
+        for enqueued_at, message, data, stages in written:
+            tp = (message.topic, message.partition)
+            self.watermarks.complete(tp, message.offset)
+            self._write_attempts.pop((message.topic, message.partition, message.offset), None)
+            state = self.partition_state.get(tp)
+            if state is not None:
+                state.processed += 1
+            self._trace(message, data, {**stages, "queue": dispatched - enqueued_at})
+        self._trace_batch([(message, data) for _, message, data, _ in written], timings, lane.name)
+        startup_timer.mark("first_message")
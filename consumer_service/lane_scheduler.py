@@ -0,0 +1,192 @@
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+class Lane:
+    """A queue of routed messages with its own weight, concurrency and latency target.
+
+    Messages are matched to a lane by object type or by source topic.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        object_types: Iterable[str] = (),
+        topics: Iterable[str] = (),
+        weight: float = 1.0,
+        concurrency: int = 1,
+        latency_target_ms: Optional[float] = None,
+        history_size: int = 200
+    ):
+        if weight <= 0:
+            raise ValueError(f"Lane {name}: weight must be positive")
+        if concurrency < 1:
+            raise ValueError(f"Lane {name}: concurrency must be at least 1")
+        self.name = name
+        self.object_types = frozenset(object_types)
+        self.topics = frozenset(topics)
+        self.weight = weight
+        self.concurrency = concurrency
+        self.latency_target_ms = latency_target_ms
+        # (enqueued_at, message, data, stages) in arrival order
+        self.queue: deque = deque()
+        self.deficit = 0.0
+        self.in_flight = 0
+        # Partitions with a batch in flight; keeps per-partition order within the lane
+        self.busy_partitions: Dict[Any, int] = {}
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.target_misses = 0
+        self.latencies_ms: deque = deque(maxlen=history_size)
+
+    def oldest_wait_ms(self, now: float) -> float:
+        return (now - self.queue[0][0]) * 1000 if self.queue else 0.0
+
+    def can_dispatch(self) -> bool:
+        return bool(self.queue) and self.in_flight < self.concurrency
+
+    def take(self, limit: int) -> List[Tuple[float, Any, Any, Dict[str, float]]]:
+        """Remove up to ``limit`` items whose partition has no batch in flight"""
+        if not self.busy_partitions:
+            return [self.queue.popleft() for _ in range(min(limit, len(self.queue)))]
+        taken, kept = [], deque()
+        blocked = set()
+        while self.queue and len(taken) < limit:
+            item = self.queue.popleft()
+            tp = (item[1].topic, item[1].partition)
+            # Once a partition is held back, later items of it must wait too
+            if tp in self.busy_partitions or tp in blocked:
+                blocked.add(tp)
+                kept.append(item)
+            else:
+                taken.append(item)
+        kept.extend(self.queue)
+        self.queue = kept
+        return taken
+
+    def record(self, latencies_ms: List[float], failed: bool = False) -> None:
+        """Record the enqueue-to-commit latency of a finished batch"""
+        self.batches += 1
+        if failed:
+            self.failed_batches += 1
+            return
+        self.written += len(latencies_ms)
+        self.latencies_ms.extend(latencies_ms)
+        if self.latency_target_ms is not None:
+            self.target_misses += sum(1 for latency in latencies_ms if latency > self.latency_target_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else None
+        return {
+            "object_types": sorted(self.object_types),
+            "topics": sorted(self.topics),
+            "weight": self.weight,
+            "concurrency": self.concurrency,
+            "latency_target_ms": self.latency_target_ms,
+            "queued": len(self.queue),
+            "oldest_wait_ms": round(self.oldest_wait_ms(time.monotonic()), 3),
+            "in_flight": self.in_flight,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "target_misses": self.target_misses,
+            "p95_latency_ms": round(p95, 3) if p95 is not None else None
+        }
+
+class WeightedFairScheduler:
+    """Deficit round robin over lanes, with latency targets taking precedence.
+
+    Each round a lane with queued messages earns ``weight * quantum`` messages
+    of credit and may dispatch up to its credit. A lane whose oldest message
+    has waited past ``urgency`` of its latency target is served first, so
+    high-priority lanes stay within their target while bulk lanes use the
+    remaining capacity.
+    """
+
+    def __init__(self, lanes: Iterable[Lane], default_lane: Lane, quantum: int = 50, urgency: float = 0.5):
+        self.lanes: Dict[str, Lane] = {}
+        for lane in list(lanes) + [default_lane]:
+            if lane.name in self.lanes:
+                raise ValueError(f"Duplicate lane name: {lane.name}")
+            self.lanes[lane.name] = lane
+        self.default_lane = default_lane
+        self.quantum = quantum
+        self.urgency = urgency
+        self._by_object_type = {t: lane for lane in self.lanes.values() for t in lane.object_types}
+        self._by_topic = {t: lane for lane in self.lanes.values() for t in lane.topics}
+        self._order = list(self.lanes.values())
+        self._cursor = 0
+
+    @classmethod
+    def from_config(cls, config: Iterable[Dict[str, Any]], quantum: int = 50) -> "WeightedFairScheduler":
+        """Build lanes from settings, adding a default lane for anything unmatched"""
+        lanes = [Lane(**entry) for entry in config]
+        default = next((lane for lane in lanes if lane.name == "default"), None)
+        if default is not None:
+            lanes.remove(default)
+        return cls(lanes, default or Lane("default"), quantum=quantum)
+
+    def classify(self, object_type: Optional[str], topic: Optional[str]) -> Lane:
+        """Object type lanes win over topic lanes; the default lane takes the rest"""
+        return self._by_object_type.get(object_type) or self._by_topic.get(topic) or self.default_lane
+
+    def queued(self) -> int:
+        return sum(len(lane.queue) for lane in self.lanes.values())
+
+    def enqueue(self, lane: Lane, message: Any, data: Any, stages: Dict[str, float]) -> None:
+        lane.queue.append((time.monotonic(), message, data, stages))
+
+    def next_batch(self, max_size: int) -> Optional[Tuple[Lane, List[Tuple[float, Any, Any, Dict[str, float]]], int]]:
+        """Pick the lane to serve next and take its batch, or None if nothing can run.
+
+        Also returns how many items the lane was allowed to take, which is
+        less than ``max_size`` when its credit capped the batch.
+        """
+        now = time.monotonic()
+        ready = [lane for lane in self._order if lane.can_dispatch()]
+        for lane in self._order:
+            if not lane.queue:
+                lane.deficit = 0.0
+        if not ready:
+            return None
+
+        overdue = [
+            lane for lane in ready
+            if lane.latency_target_ms and lane.oldest_wait_ms(now) >= lane.latency_target_ms * self.urgency
+        ]
+        if overdue:
+            lane = max(overdue, key=lambda l: l.oldest_wait_ms(now) / l.latency_target_ms)
+            items = lane.take(max_size)
+            if items:
+                return lane, items, max_size
+
+        # Deficit round robin; at most two passes so every ready lane earns credit
+        for _ in range(2 * len(self._order)):
+            lane = self._order[self._cursor]
+            if lane.can_dispatch():
+                if lane.deficit < 1:
+                    lane.deficit += lane.weight * self.quantum
+                limit = min(max_size, int(lane.deficit))
+                items = lane.take(limit)
+                if items:
+                    lane.deficit -= len(items)
+                    if lane.deficit < 1:
+                        self._cursor = (self._cursor + 1) % len(self._order)
+                    return lane, items, limit
+            self._cursor = (self._cursor + 1) % len(self._order)
+        return None
+
+    def drop(self, partitions: Iterable[Any]) -> int:
+        """Remove queued messages of revoked partitions; returns how many were dropped"""
+        revoked = set(partitions)
+        dropped = 0
+        for lane in self.lanes.values():
+            kept = deque(item for item in lane.queue if (item[1].topic, item[1].partition) not in revoked)
+            dropped += len(lane.queue) - len(kept)
+            lane.queue = kept
+        return dropped
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: lane.snapshot() for name, lane in self.lanes.items()}
@@ -0,0 +1,64 @@
+import heapq
+from typing import Dict, Hashable, Iterable, List, Optional, Set
+
+class OffsetWatermarks:
+    """Track which fetched offsets are done so commits never skip unfinished work.
+
+    Messages of one partition can finish out of order when they are written
+    by different lanes. The committable offset of a partition is its lowest
+    offset still in flight, or one past the highest offset seen when nothing
+    is in flight.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Hashable, Set[int]] = {}
+        # Min-heaps of pending offsets; completed entries are dropped lazily
+        self._heaps: Dict[Hashable, List[int]] = {}
+        self._next: Dict[Hashable, int] = {}
+
+    def track(self, tp: Hashable, offset: int) -> None:
+        """Register a fetched offset that is not finished yet"""
+        pending = self._pending.setdefault(tp, set())
+        if offset in pending:
+            return
+        pending.add(offset)
+        heapq.heappush(self._heaps.setdefault(tp, []), offset)
+        self._next[tp] = max(self._next.get(tp, 0), offset + 1)
+
+    def complete(self, tp: Hashable, offset: int) -> None:
+        """Mark an offset as finished (written, quarantined or skipped)"""
+        pending = self._pending.get(tp)
+        if pending is not None:
+            pending.discard(offset)
+        self._next[tp] = max(self._next.get(tp, 0), offset + 1)
+
+    def committable(self, tp: Hashable) -> Optional[int]:
+        """Next offset that can be committed for a partition, if any was seen"""
+        if tp not in self._next:
+            return None
+        heap = self._heaps.get(tp)
+        pending = self._pending.get(tp)
+        while heap and heap[0] not in pending:
+            heapq.heappop(heap)
+        return heap[0] if heap else self._next[tp]
+
+    def committable_after(self, tp: Hashable, offsets: Iterable[int]) -> Optional[int]:
+        """Committable offset of a partition once ``offsets`` are finished too"""
+        if tp not in self._next:
+            return None
+        finishing = set(offsets)
+        remaining = [offset for offset in self._pending.get(tp, ()) if offset not in finishing]
+        return min(remaining) if remaining else self._next[tp]
+
+    def in_flight(self, tp: Hashable) -> int:
+        return len(self._pending.get(tp, ()))
+
+    def partitions(self) -> List[Hashable]:
+        return list(self._next)
+
+    def forget(self, partitions: Iterable[Hashable]) -> None:
+        """Drop all state for partitions that are no longer assigned"""
+        for tp in partitions:
+            self._pending.pop(tp, None)
+            self._heaps.pop(tp, None)
+            self._next.pop(tp, None)
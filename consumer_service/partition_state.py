@@ -0,0 +1,21 @@
+import time
+from typing import Optional
+
+class PartitionState:
+    """Per-partition bookkeeping kept while a partition is assigned"""
+    __slots__ = ("assigned_at", "committed_offset", "restored_offset", "processed")
+
+    def __init__(self, committed_offset: Optional[int] = None):
+        self.assigned_at = time.time()
+        self.committed_offset = committed_offset
+        # Offset sought to from the database offset store, if it was ahead
+        self.restored_offset: Optional[int] = None
+        self.processed = 0
+
+    def dict(self) -> dict:
+        return {
+            "assigned_at": self.assigned_at,
+            "committed_offset": self.committed_offset,
+            "restored_offset": self.restored_offset,
+            "processed": self.processed
+        }
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from consumer_utils.logger import setup_logger
+from consumer_repository.quarantine_repository import QuarantineRepository
+from core.constants_sample import QUARANTINE_REPLAY_BATCH_SIZE
+from database import SessionLocal
+
+logger = setup_logger(__name__)
+
+class QuarantineReplayService:
+    """Re-inject quarantined messages through the consumer pipeline"""
+
+    def __init__(self, consumer_service):
+        self.consumer_service = consumer_service
+
+    async def replay(
+        self,
+        object_type: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        topic: Optional[str] = None,
+        partition: Optional[int] = None,
+        batch_size: int = QUARANTINE_REPLAY_BATCH_SIZE,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Replay quarantined messages of one object type in batches.
+
+        Each batch is routed, validated and written in one transaction.
+        Messages that are processed successfully are marked as replayed;
+        failures stay in quarantine with their attempt count and last error.
+        Quarantine reads and updates run in a worker thread.
+        """
+        if not self.consumer_service.can_process(object_type):
+            raise ValueError(f"No processor registered for object_type: {object_type}")
+
+        stats = {"object_type": object_type, "replayed": 0, "failed": 0, "batches": 0}
+        last_id = 0
+        db = SessionLocal()
+        try:
+            repository = QuarantineRepository(db)
+            while limit is None or stats["replayed"] + stats["failed"] < limit:
+                size = batch_size
+                if limit is not None:
+                    size = min(size, limit - stats["replayed"] - stats["failed"])
+                batch = await asyncio.to_thread(
+                    repository.find,
+                    object_type=object_type,
+                    since=since,
+                    until=until,
+                    topic=topic,
+                    partition=partition,
+                    after_id=last_id,
+                    limit=size
+                )
+                if not batch:
+                    break
+
+                last_id = batch[-1].id
+                # Copies: validation coerces fields in place
+                payloads = [dict(entry.payload) if isinstance(entry.payload, dict) else entry.payload for entry in batch]
+                errors = await self.consumer_service.handle_batch(payloads)
+                failures = []
+                replayed_ids = []
+                for index, entry in enumerate(batch):
+                    if index in errors:
+                        logger.error(f"Replay of quarantined message {entry.id} failed: {errors[index]}")
+                        failures.append((entry, errors[index]))
+                    else:
+                        replayed_ids.append(entry.id)
+
+                await asyncio.to_thread(repository.record_failures, failures)
+                await asyncio.to_thread(repository.mark_replayed, replayed_ids)
+                stats["failed"] += len(failures)
+                stats["replayed"] += len(replayed_ids)
+                stats["batches"] += 1
+                logger.info(f"Replayed batch of {len(batch)} quarantined {object_type} messages")
+        finally:
+            db.close()
+
+        logger.info(f"Quarantine replay completed: {stats}")
+        return stats
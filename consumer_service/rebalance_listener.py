@@ -0,0 +1,18 @@
+from aiokafka.abc import ConsumerRebalanceListener
+from consumer_utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class DrainingRebalanceListener(ConsumerRebalanceListener):
+    """Flush in-flight work before partitions move and warm state when they arrive"""
+
+    def __init__(self, consumer_service):
+        self.consumer_service = consumer_service
+
+    async def on_partitions_revoked(self, revoked):
+        logger.info(f"Partitions revoked: {sorted(str(tp) for tp in revoked)}")
+        await self.consumer_service.drain_partitions(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        logger.info(f"Partitions assigned: {sorted(str(tp) for tp in assigned)}")
+        await self.consumer_service.warm_partitions(assigned)
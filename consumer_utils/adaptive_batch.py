@@ -0,0 +1,111 @@
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+class AdaptiveBatchController:
+    """AIMD controller for the consumer's batch size and linger time.
+
+    After every batch the controller sees how long the database write and
+    commit took and whether the batch failed. While latency stays under the
+    target and errors stay rare, the batch size grows additively, and so does
+    the linger when batches come back underfilled. When latency exceeds the
+    target or the error rate rises, both are cut multiplicatively.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        min_size: int,
+        max_size: int,
+        target_latency_ms: float,
+        increase_step: int,
+        decrease_factor: float,
+        max_error_rate: float,
+        min_linger_ms: float,
+        max_linger_ms: float,
+        linger_step_ms: float,
+        enabled: bool = True,
+        smoothing: float = 0.2,
+        history_size: int = 50
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.batch_size = max(min_size, min(max_size, initial_size))
+        self.target_latency_ms = target_latency_ms
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.max_error_rate = max_error_rate
+        self.min_linger_ms = min_linger_ms
+        self.max_linger_ms = max_linger_ms
+        self.linger_step_ms = linger_step_ms
+        self.linger_ms = min_linger_ms
+        self.enabled = enabled
+        self.smoothing = smoothing
+        self.latency_ms = 0.0
+        self.error_rate = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.last_decision = "hold"
+        self.history = deque(maxlen=history_size)
+
+    def observe(self, records: int, latency_seconds: float, failed: bool = False, capacity: Optional[int] = None) -> str:
+        """Update the controller with the outcome of one batch; returns the decision.
+
+        ``capacity`` is how many records the batch could have held when
+        something smaller than ``batch_size`` capped it, such as a lane's
+        scheduling credit; a batch that reaches it counts as full.
+        """
+        full_size = self.batch_size if capacity is None else min(capacity, self.batch_size)
+        latency_ms = latency_seconds * 1000
+        self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+        self.error_rate += self.smoothing * ((1.0 if failed else 0.0) - self.error_rate)
+        if not self.enabled:
+            return "hold"
+
+        if failed or latency_ms > self.target_latency_ms or self.error_rate > self.max_error_rate:
+            self.batch_size = max(self.min_size, int(self.batch_size * self.decrease_factor))
+            self.linger_ms = max(self.min_linger_ms, self.linger_ms * self.decrease_factor)
+            decision = "decrease"
+            self.decreases += 1
+        elif records >= full_size:
+            # Full batch with headroom: try a bigger one, no need to wait for more
+            self.batch_size = min(self.max_size, self.batch_size + self.increase_step)
+            self.linger_ms = max(self.min_linger_ms, self.linger_ms - self.linger_step_ms)
+            decision = "increase"
+            self.increases += 1
+        elif records > 0:
+            # Underfilled batch: wait a little longer to amortize commits
+            self.linger_ms = min(self.max_linger_ms, self.linger_ms + self.linger_step_ms)
+            decision = "linger"
+        else:
+            decision = "hold"
+
+        self.last_decision = decision
+        self.history.append({
+            "at": time.time(),
+            "records": records,
+            "capacity": full_size,
+            "latency_ms": round(latency_ms, 3),
+            "failed": failed,
+            "decision": decision,
+            "batch_size": self.batch_size,
+            "linger_ms": round(self.linger_ms, 3)
+        })
+        return decision
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current decisions and their inputs, for tuning the target per deployment"""
+        return {
+            "enabled": self.enabled,
+            "batch_size": self.batch_size,
+            "linger_ms": round(self.linger_ms, 3),
+            "target_latency_ms": self.target_latency_ms,
+            "latency_ewma_ms": round(self.latency_ms, 3),
+            "error_rate_ewma": round(self.error_rate, 4),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "last_decision": self.last_decision,
+            "history": list(self.history)
+        }
@@ -63,7 +63,8 @@ class LogCleanup:
         """Clean up unidentified messages log file"""
         unidentified_file = os.path.join(self.log_dir, "unidentified_messages.log")
         
-        if os.path.exists(unidentified_file):
+        # Nothing to rotate when the fallback file is missing or empty
+        if os.path.exists(unidentified_file) and os.path.getsize(unidentified_file) > 0:
             try:
                 # Create backup with timestamp
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1,41 +1,50 @@
 import logging
 import os
+from typing import List
 from pythonjsonlogger import jsonlogger
-from core.config import Settings
-from core.constants import (
+from core.config_sample import settings
+from core.constants_sample import (
     LOG_FORMAT,
     LOG_LEVEL_INFO,
     LOG_LEVEL_ERROR,
     LOG_LEVEL_WARNING
 )
 
+# Handlers shared by every logger so the log file is opened only once
+_handlers: List[logging.Handler] = []
+
+def _get_handlers() -> List[logging.Handler]:
+    if not _handlers:
+        # Create logs directory if it doesn't exist
+        os.makedirs(os.path.dirname(settings.LOG_FILE), exist_ok=True)
+        
+        # Create handlers
+        file_handler = logging.FileHandler(settings.LOG_FILE)
+        console_handler = logging.StreamHandler()
+        
+        # Create formatters
+        json_formatter = jsonlogger.JsonFormatter(
+            fmt='%(asctime)s %(name)s %(levelname)s %(message)s'
+        )
+        console_formatter = logging.Formatter(LOG_FORMAT)
+        
+        # Set formatters
+        file_handler.setFormatter(json_formatter)
+        console_handler.setFormatter(console_formatter)
+        
+        _handlers.extend([file_handler, console_handler])
+    return _handlers
+
 def setup_logger(name: str) -> logging.Logger:
     """Setup logger with file and console handlers"""
-    settings = Settings()
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs(os.path.dirname(settings.LOG_FILE), exist_ok=True)
-    
     # Create logger
     logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
     logger.setLevel(settings.LOG_LEVEL)
     
-    # Create handlers
-    file_handler = logging.FileHandler(settings.LOG_FILE)
-    console_handler = logging.StreamHandler()
-    
-    # Create formatters
-    json_formatter = jsonlogger.JsonFormatter(
-        fmt='%(asctime)s %(name)s %(levelname)s %(message)s'
-    )
-    console_formatter = logging.Formatter(LOG_FORMAT)
-    
-    # Set formatters
-    file_handler.setFormatter(json_formatter)
-    console_handler.setFormatter(console_formatter)
-    
     # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    for handler in _get_handlers():
+        logger.addHandler(handler)
     
-    return logger 
\ No newline at end of file
+    return logger
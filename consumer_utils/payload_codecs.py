@@ -0,0 +1,283 @@
+import json
+import os
+import re
+import struct
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional dependency, only needed for MessagePack payloads
+    msgpack = None
+
+from core.constants_sample import (
+    HEADER_CONTENT_TYPE,
+    HEADER_SCHEMA_ID,
+    CONTENT_TYPE_JSON,
+    CONTENT_TYPE_MSGPACK,
+    CONTENT_TYPE_AVRO
+)
+
+_EPOCH_DATE = date(1970, 1, 1)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SCHEMA_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+# A reader takes (buffer, position) and returns (value, new position);
+# a skipper takes (buffer, position) and returns the new position only.
+Reader = Callable[[bytes, int], Tuple[Any, int]]
+Skipper = Callable[[bytes, int], int]
+
+def _read_long(buf: bytes, pos: int) -> Tuple[int, int]:
+    """Read a zigzag-encoded variable-length integer"""
+    byte = buf[pos]
+    pos += 1
+    value = byte & 0x7F
+    shift = 7
+    while byte & 0x80:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+    return (value >> 1) ^ -(value & 1), pos
+
+def _read_bytes(buf: bytes, pos: int) -> Tuple[bytes, int]:
+    length, pos = _read_long(buf, pos)
+    return bytes(buf[pos:pos + length]), pos + length
+
+def _read_string(buf: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_long(buf, pos)
+    return buf[pos:pos + length].decode("utf-8"), pos + length
+
+def _skip_bytes(buf: bytes, pos: int) -> int:
+    length, pos = _read_long(buf, pos)
+    return pos + length
+
+def _read_boolean(buf: bytes, pos: int) -> Tuple[bool, int]:
+    return buf[pos] != 0, pos + 1
+
+def _read_float(buf: bytes, pos: int) -> Tuple[float, int]:
+    return struct.unpack_from("<f", buf, pos)[0], pos + 4
+
+def _read_double(buf: bytes, pos: int) -> Tuple[float, int]:
+    return struct.unpack_from("<d", buf, pos)[0], pos + 8
+
+def _read_null(buf: bytes, pos: int) -> Tuple[None, int]:
+    return None, pos
+
+_PRIMITIVE_READERS: Dict[str, Reader] = {
+    "null": _read_null,
+    "boolean": _read_boolean,
+    "int": _read_long,
+    "long": _read_long,
+    "float": _read_float,
+    "double": _read_double,
+    "bytes": _read_bytes,
+    "string": _read_string,
+}
+
+_PRIMITIVE_SKIPPERS: Dict[str, Skipper] = {
+    "null": lambda buf, pos: pos,
+    "boolean": lambda buf, pos: pos + 1,
+    "float": lambda buf, pos: pos + 4,
+    "double": lambda buf, pos: pos + 8,
+    "bytes": _skip_bytes,
+    "string": _skip_bytes,
+}
+
+def _logical(reader: Reader, logical_type: Optional[str]) -> Reader:
+    """Wrap a reader to convert Avro logical types to Python values"""
+    if logical_type == "date":
+        def read_date(buf: bytes, pos: int) -> Tuple[date, int]:
+            days, pos = reader(buf, pos)
+            return _EPOCH_DATE + timedelta(days=days), pos
+        return read_date
+    if logical_type in ("timestamp-millis", "timestamp-micros"):
+        unit = "milliseconds" if logical_type == "timestamp-millis" else "microseconds"
+        def read_timestamp(buf: bytes, pos: int) -> Tuple[datetime, int]:
+            value, pos = reader(buf, pos)
+            return _EPOCH + timedelta(**{unit: value}), pos
+        return read_timestamp
+    return reader
+
+def _compile(schema: Any, named: Dict[str, Tuple[Reader, Skipper]]) -> Tuple[Reader, Skipper]:
+    """Compile an Avro schema node into a reader and a skipper"""
+    if isinstance(schema, str):
+        if schema in named:
+            return named[schema]
+        if schema not in _PRIMITIVE_READERS:
+            raise ValueError(f"Unknown Avro type: {schema}")
+        reader = _PRIMITIVE_READERS[schema]
+        skipper = _PRIMITIVE_SKIPPERS.get(schema) or (lambda buf, pos, read=reader: read(buf, pos)[1])
+        return reader, skipper
+
+    if isinstance(schema, list):
+        branches = [_compile(branch, named) for branch in schema]
+
+        def read_union(buf: bytes, pos: int) -> Tuple[Any, int]:
+            index, pos = _read_long(buf, pos)
+            return branches[index][0](buf, pos)
+
+        def skip_union(buf: bytes, pos: int) -> int:
+            index, pos = _read_long(buf, pos)
+            return branches[index][1](buf, pos)
+        return read_union, skip_union
+
+    avro_type = schema["type"]
+    if avro_type in _PRIMITIVE_READERS:
+        reader, skipper = _compile(avro_type, named)
+        return _logical(reader, schema.get("logicalType")), skipper
+
+    if avro_type == "enum":
+        symbols = schema["symbols"]
+
+        def read_enum(buf: bytes, pos: int) -> Tuple[str, int]:
+            index, pos = _read_long(buf, pos)
+            return symbols[index], pos
+        compiled = (read_enum, lambda buf, pos: _read_long(buf, pos)[1])
+        named[schema["name"]] = compiled
+        return compiled
+
+    if avro_type == "fixed":
+        size = schema["size"]
+        compiled = (lambda buf, pos: (bytes(buf[pos:pos + size]), pos + size), lambda buf, pos: pos + size)
+        named[schema["name"]] = compiled
+        return compiled
+
+    if avro_type in ("array", "map"):
+        item_reader, _ = _compile(schema["items" if avro_type == "array" else "values"], named)
+        is_map = avro_type == "map"
+
+        def read_blocks(buf: bytes, pos: int) -> Tuple[Any, int]:
+            result = {} if is_map else []
+            while True:
+                count, pos = _read_long(buf, pos)
+                if count == 0:
+                    return result, pos
+                if count < 0:
+                    count = -count
+                    _, pos = _read_long(buf, pos)  # block size in bytes
+                for _ in range(count):
+                    if is_map:
+                        key, pos = _read_string(buf, pos)
+                        result[key], pos = item_reader(buf, pos)
+                    else:
+                        item, pos = item_reader(buf, pos)
+                        result.append(item)
+
+        def skip_blocks(buf: bytes, pos: int) -> int:
+            return read_blocks(buf, pos)[1]
+        return read_blocks, skip_blocks
+
+    if avro_type == "record":
+        record_reader = compile_record_reader(schema, None, named)
+
+        def read_nested(buf: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+            return record_reader(buf, pos)
+        compiled = (read_nested, lambda buf, pos: read_nested(buf, pos)[1])
+        named[schema["name"]] = compiled
+        return compiled
+
+    raise ValueError(f"Unsupported Avro type: {avro_type}")
+
+def compile_record_reader(
+    schema: Dict[str, Any],
+    wanted: Optional[FrozenSet[str]],
+    named: Optional[Dict[str, Tuple[Reader, Skipper]]] = None
+) -> Callable[[bytes, int], Tuple[Dict[str, Any], int]]:
+    """Compile a record schema into a reader that only materializes wanted fields.
+
+    Unwanted fields are skipped without building Python objects for them.
+    """
+    named = {} if named is None else named
+    steps = []
+    for field in schema["fields"]:
+        reader, skipper = _compile(field["type"], named)
+        if wanted is None or field["name"] in wanted:
+            steps.append((field["name"], reader))
+        else:
+            steps.append((None, skipper))
+
+    def read_record(buf: bytes, pos: int = 0) -> Tuple[Dict[str, Any], int]:
+        record = {}
+        for name, step in steps:
+            if name is None:
+                pos = step(buf, pos)
+            else:
+                record[name], pos = step(buf, pos)
+        return record, pos
+    return read_record
+
+class SchemaRegistry:
+    """File-based stand-in for a schema registry: ``<directory>/<schema_id>.avsc``"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._schemas: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, schema_id: str) -> Dict[str, Any]:
+        schema = self._schemas.get(schema_id)
+        if schema is None:
+            if not _SCHEMA_ID_PATTERN.match(schema_id):
+                raise ValueError(f"Invalid schema id: {schema_id!r}")
+            path = os.path.join(self.directory, f"{schema_id}.avsc")
+            try:
+                with open(path) as f:
+                    schema = json.load(f)
+            except FileNotFoundError:
+                raise ValueError(f"Unknown schema id: {schema_id}")
+            if schema.get("type") != "record":
+                raise ValueError(f"Schema {schema_id} must be a record")
+            self._schemas[schema_id] = schema
+        return schema
+
+class PayloadDecoder:
+    """Decode message values according to their content-type header.
+
+    Messages without the header are treated as JSON, so mixed-format topics
+    keep working. Avro readers are compiled once per schema id and only
+    materialize the payload fields the registered object types use.
+    """
+
+    def __init__(self, schema_registry: SchemaRegistry, wanted_fields: Iterable[str]):
+        self.schema_registry = schema_registry
+        self.wanted_fields = frozenset(wanted_fields)
+        self._readers: Dict[Tuple[str, bool], Callable] = {}
+
+    @staticmethod
+    def headers_to_dict(headers: Optional[Sequence[Tuple[str, bytes]]]) -> Dict[str, str]:
+        if not headers:
+            return {}
+        return {key.lower(): value.decode("utf-8") if isinstance(value, bytes) else value for key, value in headers}
+
+    @staticmethod
+    def media_type(content_type: str) -> str:
+        """The media type of a content-type value, without parameters such as ``charset``"""
+        return content_type.split(";", 1)[0].strip().lower()
+
+    def content_type(self, headers: Optional[Sequence[Tuple[str, bytes]]]) -> str:
+        return self.media_type(self.headers_to_dict(headers).get(HEADER_CONTENT_TYPE, CONTENT_TYPE_JSON))
+
+    def decode(self, value: bytes, headers: Optional[Sequence[Tuple[str, bytes]]] = None, full: bool = False) -> Any:
+        """Decode a message value; ``full`` materializes every Avro field"""
+        header_values = self.headers_to_dict(headers)
+        content_type = self.media_type(header_values.get(HEADER_CONTENT_TYPE, CONTENT_TYPE_JSON))
+        if content_type == CONTENT_TYPE_JSON:
+            return json.loads(value)
+        if content_type == CONTENT_TYPE_MSGPACK:
+            if msgpack is None:
+                raise ValueError("MessagePack payloads require the msgpack package")
+            return msgpack.unpackb(value, raw=False)
+        if content_type == CONTENT_TYPE_AVRO:
+            schema_id = header_values.get(HEADER_SCHEMA_ID)
+            if not schema_id:
+                raise ValueError(f"Avro payload missing {HEADER_SCHEMA_ID} header")
+            return self._reader(schema_id, full)(value, 0)[0]
+        raise ValueError(f"Unsupported content type: {content_type}")
+
+    def _reader(self, schema_id: str, full: bool) -> Callable:
+        reader = self._readers.get((schema_id, full))
+        if reader is None:
+            schema = self.schema_registry.get(schema_id)
+            reader = compile_record_reader(schema, None if full else self.wanted_fields)
+            self._readers[(schema_id, full)] = reader
+        return reader
@@ -0,0 +1,21 @@
+import asyncio
+from typing import Callable
+from consumer_utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+async def run_periodically(func: Callable[[], None], interval_seconds: float, name: str, initial_delay: float = 0) -> None:
+    """Run a blocking maintenance function in a worker thread on a fixed interval.
+
+    Errors are logged and the job keeps its schedule; cancelling the task
+    stops it.
+    """
+    await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            await asyncio.to_thread(func)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Periodic job {name} failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,136 @@
+"""Copy the registry tables and stored offsets into a new shard layout.
+
+Reads every row of the current layout (SHARD_COUNT, SHARD_PATH_TEMPLATE,
+SHARD_KEY) and writes it to the shard the target layout routes it to. Rows
+keep their content, versions, timestamps and tombstones; ids are assigned
+by the target shards. Stored consumer offsets are copied as the lowest
+offset across the source shards, so the consumer resumes where every shard
+is complete.
+
+Stop the consumer first, then switch SHARD_COUNT and SHARD_PATH_TEMPLATE to
+the target layout and start it again. The target must be empty, since rows
+already there would be kept over the source ones. To finish an interrupted
+run, repeat it with --resume: rows the first run copied are left untouched.
+
+Usage:
+    python -m consumer_utils.reshard --to-count 8 --to-template data/shards-8/enterprise-{index}.db
+    python -m consumer_utils.reshard --to-count 1
+    python -m consumer_utils.reshard --to-count 8 --to-template data/shards-8/enterprise-{index}.db --resume
+"""
+import argparse
+from typing import Dict, List, Tuple
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from consumer_business.object_registry import registry
+from consumer_entities.consumer_offset_model import ConsumerOffset
+from consumer_utils.logger import setup_logger
+from core.config_sample import settings
+from database import Base, ShardSet, shards
+
+logger = setup_logger(__name__)
+
+def copy_table(spec, source: ShardSet, target: ShardSet, chunk_size: int) -> int:
+    """Copy one registry table shard by shard, in id order and in chunks"""
+    table = spec.table
+    columns = [column for column in table.columns if column.name != "id"]
+    statement = sqlite_insert(table).on_conflict_do_nothing(index_elements=[spec.key])
+    copied = 0
+    for shard in source.shards:
+        last_id = 0
+        with shard.engine.connect() as reader:
+            while True:
+                rows = reader.execute(
+                    select(table).where(table.c.id > last_id).order_by(table.c.id).limit(chunk_size)
+                ).mappings().all()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+                groups: Dict[int, list] = {}
+                for row in rows:
+                    index = target.route({"event_id": row[spec.key], "object_type": spec.object_type})
+                    groups.setdefault(index, []).append({column.name: row[column.name] for column in columns})
+                for index, group in groups.items():
+                    with target.shards[index].engine.begin() as writer:
+                        writer.execute(statement, group)
+                copied += len(rows)
+    return copied
+
+def copy_offsets(source: ShardSet, target: ShardSet) -> int:
+    """Write the lowest stored offset every source shard has reached to every target shard"""
+    table = ConsumerOffset.__table__
+    offsets: Dict[Tuple[str, str, int], int] = {}
+    seen: Dict[Tuple[str, str, int], int] = {}
+    for shard in source.shards:
+        with shard.engine.connect() as reader:
+            for row in reader.execute(select(table)).mappings():
+                key = (row["group_id"], row["topic"], row["partition"])
+                offsets[key] = min(row["next_offset"], offsets.get(key, row["next_offset"]))
+                seen[key] = seen.get(key, 0) + 1
+    # A partition missing on some shard has no offset all shards agree on
+    rows = [
+        {"group_id": group_id, "topic": topic, "partition": partition, "next_offset": offset}
+        for (group_id, topic, partition), offset in offsets.items()
+        if seen[(group_id, topic, partition)] == source.count
+    ]
+    if rows:
+        statement = sqlite_insert(table).on_conflict_do_nothing(index_elements=["group_id", "topic", "partition"])
+        for shard in target.shards:
+            with shard.engine.begin() as writer:
+                writer.execute(statement, rows)
+    return len(rows)
+
+def populated_tables(target: ShardSet) -> List[str]:
+    """Registry and offset tables that already have rows on some target shard"""
+    tables = [spec.table for spec in registry] + [ConsumerOffset.__table__]
+    populated = []
+    for table in tables:
+        for shard in target.shards:
+            with shard.engine.connect() as reader:
+                if reader.execute(select(exists().select_from(table))).scalar():
+                    populated.append(table.name)
+                    break
+    return populated
+
+def reshard(source: ShardSet, target: ShardSet, chunk_size: int = 1000, resume: bool = False) -> Dict[str, int]:
+    """Copy every registry table and the stored offsets from ``source`` to ``target``.
+
+    Refuses a target that already has rows unless ``resume`` is set, since
+    existing rows are kept over the source ones.
+    """
+    overlap = {str(shard.engine.url) for shard in source.shards} & {str(shard.engine.url) for shard in target.shards}
+    if overlap:
+        raise ValueError(f"Target layout reuses source databases: {sorted(overlap)}")
+
+    target.ensure_schema(Base.metadata)
+    if not resume:
+        populated = populated_tables(target)
+        if populated:
+            raise ValueError(
+                f"Target layout already has rows in {', '.join(populated)}; "
+                f"use an empty target, or --resume to finish an interrupted run"
+            )
+    counts = {}
+    for spec in registry:
+        counts[spec.object_type] = copy_table(spec, source, target, chunk_size)
+        logger.info(f"Copied {counts[spec.object_type]} {spec.object_type} rows to {target.count} shards")
+    counts["consumer_offsets"] = copy_offsets(source, target)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to-count", type=int, required=True)
+    parser.add_argument("--to-template", default=settings.SHARD_PATH_TEMPLATE)
+    parser.add_argument("--to-key", default=settings.SHARD_KEY)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run into a non-empty target")
+    args = parser.parse_args()
+
+    target = ShardSet.from_layout(args.to_count, args.to_template, args.to_key)
+    counts = reshard(shards, target, args.chunk_size, args.resume)
+    for name, count in counts.items():
+        print(f"{name:<20}{count:>10}")
+    print(f"Set SHARD_COUNT={args.to_count}, SHARD_PATH_TEMPLATE={args.to_template}, SHARD_KEY={args.to_key} and restart the consumer")
+    target.dispose()
+
+if __name__ == "__main__":
+    main()
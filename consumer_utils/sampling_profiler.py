@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+class SamplingProfiler:
+    """Time-boxed statistical profiler for every thread in this process.
+
+    Stacks are sampled from ``sys._current_frames()`` on a background thread,
+    so the event loop running the consumer is observed without being
+    instrumented. Results are in the folded format read by flamegraph.pl and
+    speedscope: one ``frame;frame;frame count`` line per distinct stack.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, duration_seconds: float, interval_seconds: float) -> str:
+        """Sample all threads for the given duration and return folded stacks"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            samples: Counter = Counter()
+            own_thread = threading.get_ident()
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            deadline = time.perf_counter() + duration_seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_thread:
+                        samples[self._fold(thread_names.get(thread_id, str(thread_id)), frame)] += 1
+                time.sleep(interval_seconds)
+            return "\n".join(f"{stack} {count}" for stack, count in samples.most_common()) + "\n"
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _fold(thread_name: str, frame: Optional[object]) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(f"thread {thread_name}")
+        return ";".join(reversed(stack))
+
+# Process-wide profiler used by the admin endpoint
+profiler = SamplingProfiler()
@@ -0,0 +1,71 @@
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+
+class SlowMessageTracer:
+    """Keep per-stage timings of messages and batches slower than a threshold.
+
+    Per-message stages (decode, route, queue) are recorded for each message.
+    Stages that a whole batch shares (validate, db_write, db_commit) are
+    recorded once per batch with the offsets it covered, so one slow batch
+    takes one entry. Entries go into a bounded ring buffer, so the oldest
+    traces are dropped once ``capacity`` is reached.
+    """
+
+    def __init__(self, threshold_ms: float, capacity: int):
+        self.threshold_ms = threshold_ms
+        self.entries = deque(maxlen=capacity)
+
+    def record(self, message, object_type: Optional[str], stages: Dict[str, float]) -> bool:
+        """Record a message if its own stage timings (in seconds) exceed the threshold"""
+        total_ms = sum(stages.values()) * 1000
+        if total_ms < self.threshold_ms:
+            return False
+        self.entries.append({
+            "kind": "message",
+            "recorded_at": datetime.utcnow().isoformat(),
+            "topic": getattr(message, "topic", None),
+            "partition": getattr(message, "partition", None),
+            "offset": getattr(message, "offset", None),
+            "object_type": object_type,
+            "total_ms": round(total_ms, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+        })
+        return True
+
+    def record_batch(
+        self,
+        messages: List[Any],
+        object_types: Iterable[Optional[str]],
+        stages: Dict[str, float],
+        lane: Optional[str] = None
+    ) -> bool:
+        """Record a batch if its shared stage timings (in seconds) exceed the threshold"""
+        total_ms = sum(stages.values()) * 1000
+        if not messages or total_ms < self.threshold_ms:
+            return False
+        ranges: Dict[tuple, List[int]] = {}
+        for message in messages:
+            key = (getattr(message, "topic", None), getattr(message, "partition", None))
+            offset = getattr(message, "offset", None)
+            bounds = ranges.setdefault(key, [offset, offset])
+            if offset is not None:
+                bounds[0] = offset if bounds[0] is None else min(bounds[0], offset)
+                bounds[1] = offset if bounds[1] is None else max(bounds[1], offset)
+        self.entries.append({
+            "kind": "batch",
+            "recorded_at": datetime.utcnow().isoformat(),
+            "lane": lane,
+            "batch_size": len(messages),
+            "offsets": [
+                {"topic": topic, "partition": partition, "first": first, "last": last}
+                for (topic, partition), (first, last) in ranges.items()
+            ],
+            "object_types": sorted({object_type for object_type in object_types if object_type}),
+            "total_ms": round(total_ms, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+        })
+        return True
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return list(self.entries)
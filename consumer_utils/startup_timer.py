@@ -0,0 +1,36 @@
+import time
+from typing import Dict, Any
+from consumer_utils.logger import setup_logger
+from core.config_sample import settings
+
+logger = setup_logger(__name__)
+
+class StartupTimer:
+    """Record elapsed time from process start to each startup milestone"""
+
+    def __init__(self, budget_seconds: float):
+        self.origin = time.perf_counter()
+        self.budget_seconds = budget_seconds
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """Record the first time a phase is reached"""
+        if phase not in self.phases:
+            self.phases[phase] = time.perf_counter() - self.origin
+            logger.info(f"Startup phase {phase} reached after {self.phases[phase]:.3f}s")
+
+    def check_budget(self, phase: str) -> bool:
+        """Warn if a phase was reached after the startup budget"""
+        elapsed = self.phases.get(phase)
+        if elapsed is not None and elapsed > self.budget_seconds:
+            logger.warning(
+                f"Startup phase {phase} took {elapsed:.3f}s, over the {self.budget_seconds:.3f}s budget"
+            )
+            return False
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        return {"budget_seconds": self.budget_seconds, "phases": dict(self.phases)}
+
+# Process-wide timer, created when the entry point first imports it
+startup_timer = StartupTimer(settings.STARTUP_BUDGET_SECONDS)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from consumer_business.object_registry import registry
+from consumer_utils.logger import setup_logger
+from core.config_sample import settings
+from database import SessionLocal, shards
+
+logger = setup_logger(__name__)
+
+class TombstoneCompaction:
+    """Hard-delete soft-deleted rows once they pass the retention window"""
+
+    def __init__(self, retention_days: int = None, chunk_size: int = None):
+        self.retention_days = retention_days or settings.TOMBSTONE_RETENTION_DAYS
+        self.chunk_size = chunk_size or settings.TOMBSTONE_COMPACTION_CHUNK_SIZE
+
+    def compact_table(self, table, cutoff: datetime, session_factory=SessionLocal) -> int:
+        """Delete expired tombstones in chunks, committing after each chunk"""
+        expired_ids = (
+            select(table.c.id)
+            .where(table.c.deleted_at.is_not(None))
+            .where(table.c.deleted_at < cutoff)
+            .limit(self.chunk_size)
+            .scalar_subquery()
+        )
+        statement = delete(table).where(table.c.id.in_(expired_ids))
+        removed = 0
+        db = session_factory()
+        try:
+            while True:
+                chunk = db.execute(statement).rowcount
+                db.commit()
+                removed += chunk
+                if chunk < self.chunk_size:
+                    return removed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def compact(self) -> int:
+        """Compact tombstones of every registered object type"""
+        if not settings.TOMBSTONE_COMPACTION_ENABLED:
+            logger.info("Tombstone compaction is disabled")
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        total = 0
+        for spec in registry:
+            removed = sum(self.compact_table(spec.table, cutoff, shard.session_factory) for shard in shards.shards)
+            if removed:
+                logger.info(f"Compacted {removed} {spec.object_type} tombstones older than {cutoff.isoformat()}")
+            total += removed
+        return total
+
+def compact_tombstones() -> None:
+    """Main function to perform tombstone compaction"""
+    TombstoneCompaction().compact()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,12 +10,34 @@ class Settings(BaseSettings):
     KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
     KAFKA_GROUP_ID: str = "consumer-group"
     KAFKA_TOPIC: str = "events-topic"
+    # Comma-separated topics to subscribe to; empty means the sales events topic
+    KAFKA_TOPICS: str = ""
     KAFKA_AUTO_OFFSET_RESET: str = "earliest"
     KAFKA_MAX_POLL_RECORDS: int = 100
+    KAFKA_POLL_TIMEOUT_MS: int = 1000
     KAFKA_SESSION_TIMEOUT_MS: int = 60000
+    # Static group membership: an explicit ID, or the pod hostname when enabled
+    KAFKA_GROUP_INSTANCE_ID: Optional[str] = None
+    KAFKA_STATIC_MEMBERSHIP: bool = False
     
     # Database settings
     DATABASE_URL: str = "sqlite:///data/enterprise.db"
+    # Statement caches: compiled SQL per engine, prepared statements per connection
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    # Store consumer offsets in the database, in the same transaction as each batch
+    OFFSET_STORE_ENABLED: bool = False
+    # "core" writes tuple records with executemany, "orm" goes through the session
+    WRITE_PATH: str = "core"
+    
+    # Sharded storage: 0 or 1 keeps everything in DATABASE_URL; N > 1 routes rows
+    # by SHARD_KEY ("event_id" or "object_type") to N files named by the template
+    SHARD_COUNT: int = 0
+    SHARD_KEY: str = "event_id"
+    SHARD_PATH_TEMPLATE: str = "data/shards/enterprise-{index}.db"
+    
+    # Schema registry stand-in for Avro payloads (<dir>/<schema_id>.avsc)
+    SCHEMA_REGISTRY_DIR: str = "schemas"
     
     # Logging settings
     LOG_LEVEL: str = "INFO"
@@ -33,6 +55,47 @@ class Settings(BaseSettings):
     # Cleanup settings
     LOG_CLEANUP_DAYS: int = 30
     LOG_CLEANUP_ENABLED: bool = True
+    LOG_CLEANUP_INTERVAL_SECONDS: int = 3600
+    TOMBSTONE_COMPACTION_ENABLED: bool = True
+    TOMBSTONE_RETENTION_DAYS: int = 7
+    TOMBSTONE_COMPACTION_CHUNK_SIZE: int = 500
+    TOMBSTONE_COMPACTION_INTERVAL_SECONDS: int = 3600
+    
+    # Adaptive batching settings (initial size is KAFKA_MAX_POLL_RECORDS)
+    ADAPTIVE_BATCHING_ENABLED: bool = True
+    BATCH_MIN_SIZE: int = 10
+    BATCH_MAX_SIZE: int = 2000
+    BATCH_TARGET_COMMIT_LATENCY_MS: float = 200.0
+    BATCH_INCREASE_STEP: int = 50
+    BATCH_DECREASE_FACTOR: float = 0.5
+    BATCH_MAX_ERROR_RATE: float = 0.05
+    BATCH_MIN_LINGER_MS: float = 0.0
+    BATCH_MAX_LINGER_MS: float = 50.0
+    BATCH_LINGER_STEP_MS: float = 5.0
+    
+    # Priority lanes (JSON list). A lane matches object_types or topics and has
+    # a weight, a concurrency and an optional latency target; a "default" lane
+    # with weight 1 takes unmatched messages unless configured explicitly.
+    CONSUMER_LANES: List[Dict[str, Any]] = [
+        {"name": "realtime", "object_types": ["Opportunity"], "weight": 4, "concurrency": 1, "latency_target_ms": 500},
+        {"name": "bulk", "object_types": ["Project"], "weight": 1, "concurrency": 1}
+    ]
+    LANE_QUANTUM: int = 50
+    LANE_MAX_QUEUED_MESSAGES: int = 5000
+    LANE_MAX_CONCURRENT_BATCHES: int = 2
+    # Failed attempts of a lane batch before its records are written one by one
+    # and the ones that still fail are quarantined
+    LANE_MAX_BATCH_ATTEMPTS: int = 3
+    
+    # Diagnostics settings
+    SLOW_MESSAGE_THRESHOLD_MS: float = 500.0
+    SLOW_MESSAGE_BUFFER_SIZE: int = 200
+    PROFILER_MAX_SECONDS: int = 60
+    PROFILER_DEFAULT_INTERVAL_MS: int = 10
+    
+    # Startup settings
+    STARTUP_BUDGET_SECONDS: float = 5.0
+    MAINTENANCE_INITIAL_DELAY_SECONDS: int = 60
     
     class Config:
         env_file = ".env"
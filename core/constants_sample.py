@@ -1,5 +1,19 @@
 from typing import Dict, Any
 
+# Kafka
+KAFKA_TOPIC_SALES_EVENTS = "sales_events"
+DB_AUTO_OFFSET_RESET = "earliest"
+
+# Retries
+MAX_RETRIES = 3
+RETRY_DELAY = 1
+
+# Logging
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_LEVEL_INFO = "INFO"
+LOG_LEVEL_WARNING = "WARNING"
+LOG_LEVEL_ERROR = "ERROR"
+
 # Message Types
 MESSAGE_TYPE_OPPORTUNITY = "opportunity"
 MESSAGE_TYPE_PROJECT = "project"
@@ -44,6 +58,20 @@ ERROR_MESSAGES = {
     "validation_error": "Validation failed"
 }
 
+# Consumer Log Messages
+ERROR_START_CONSUMER = "Failed to start Kafka consumer: {}"
+ERROR_STOP_CONSUMER = "Failed to stop Kafka consumer: {}"
+ERROR_PROCESS_MESSAGE = "Failed to process message: {}"
+ERROR_DECODE_MESSAGE = "Failed to decode message: {}"
+ERROR_CONSUME_LOOP = "Error in consume loop: {}"
+ERROR_FATAL = "Fatal error in consumer: {}"
+ERROR_UNKNOWN_OBJECT = "No processor registered for object_type: {}"
+ERROR_MISSING_OBJECT_TYPE = "Message missing object_type: {}"
+SUCCESS_START_CONSUMER = "Kafka consumer started"
+SUCCESS_STOP_CONSUMER = "Kafka consumer stopped"
+SUCCESS_PROCESS_MESSAGE = "Processed batch: {}"
+SUCCESS_CANCEL_TASK = "Consume task cancelled"
+
 # Success Messages
 SUCCESS_MESSAGES = {
     "message_processed": "Message processed successfully",
@@ -53,4 +81,30 @@ SUCCESS_MESSAGES = {
 
 # File Patterns
 LOG_FILE_PATTERN = "*.log"
-UNIDENTIFIED_MESSAGES_PATTERN = "unidentified_messages.log" 
\ No newline at end of file
+UNIDENTIFIED_MESSAGES_PATTERN = "unidentified_messages.log"
+UNIDENTIFIED_MESSAGES_FILE = "logs/unidentified_messages.log"
+
+# Quarantine Reasons
+QUARANTINE_REASON_MISSING_OBJECT_TYPE = "missing_object_type"
+QUARANTINE_REASON_UNKNOWN_OBJECT_TYPE = "unknown_object_type"
+QUARANTINE_REASON_INVALID_PAYLOAD = "invalid_payload"
+QUARANTINE_REASON_INVALID_FIELDS = "invalid_fields"
+QUARANTINE_REASON_WRITE_FAILED = "write_failed"
+
+# Quarantine Replay
+QUARANTINE_REPLAY_BATCH_SIZE = 100
+
+# Object Types
+OBJECT_TYPE_OPPORTUNITY = "Opportunity"
+OBJECT_TYPE_PROJECT = "Project"
+
+# Payload Formats
+HEADER_CONTENT_TYPE = "content-type"
+HEADER_SCHEMA_ID = "schema-id"
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+CONTENT_TYPE_AVRO = "application/avro"
+
+# Write Paths
+WRITE_PATH_CORE = "core"
+WRITE_PATH_ORM = "orm"
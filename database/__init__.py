@@ -1,3 +1,5 @@
 from database.connection import Base, engine, get_db, SessionLocal
+from database.schema import ensure_schema
+from database.sharding import ShardSet, shards
 
-__all__ = ['Base', 'engine', 'get_db', 'SessionLocal'] 
\ No newline at end of file
+__all__ = ['Base', 'engine', 'get_db', 'SessionLocal', 'ensure_schema', 'ShardSet', 'shards']
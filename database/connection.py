@@ -10,11 +10,20 @@ os.makedirs("data", exist_ok=True)
 # Create SQLite database URL
 SQLITE_DATABASE_URL = "sqlite:///data/enterprise.db"
 
+def create_database_engine(url: str):
+    """Create an engine with the consumer's connection settings"""
+    return create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,  # Needed for SQLite
+            # Prepared statements kept per connection by the sqlite3 driver
+            "cached_statements": settings.DB_STATEMENT_CACHE_SIZE
+        },
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE
+    )
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    SQLITE_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+engine = create_database_engine(SQLITE_DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
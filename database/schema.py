@@ -0,0 +1,107 @@
+import zlib
+from typing import List
+from sqlalchemy import MetaData, func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import Column, CreateColumn
+
+# Engines whose schema has already been checked in this process
+_checked_engines = set()
+
+def schema_version(metadata: MetaData) -> int:
+    """Stable 31-bit stamp of the declared tables, columns and indexes"""
+    parts = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(
+            f"{column.name}:{column.type!r}:{column.nullable}:{column.unique}"
+            for column in table.columns
+        )
+        parts.extend(sorted(index.name for index in table.indexes))
+    return zlib.crc32("|".join(parts).encode("utf-8")) & 0x7FFFFFFF
+
+def _can_add(column: Column) -> bool:
+    """Whether ALTER TABLE ADD COLUMN can add the column to a table with rows"""
+    if column.primary_key or (column.unique and not column.index):
+        return False
+    return column.nullable or column.server_default is not None
+
+def upgrade_tables(conn: Connection, metadata: MetaData) -> List[str]:
+    """Bring existing tables up to the declared columns and indexes.
+
+    ``create_all`` only creates missing tables. Missing columns that can be
+    added in place get an ALTER TABLE. A table that lacks a column which
+    cannot be added (primary keys, inline unique constraints, NOT NULL
+    without a server default) is dropped and recreated when it is empty.
+
+    Every table is checked before any DDL runs, because the sqlite3 driver
+    does not run DDL inside the transaction. If a table with rows needs such
+    a column, nothing is changed and its columns are returned as
+    ``table.column`` for a manual migration.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    plans = []
+    blocked = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        unaddable = [column for column in missing if not _can_add(column)]
+        if unaddable:
+            if conn.execute(select(func.count()).select_from(table)).scalar():
+                blocked.extend(f"{table.name}.{column.name}" for column in unaddable)
+                continue
+            plans.append((table, None))
+        else:
+            plans.append((table, missing))
+    if blocked:
+        return blocked
+
+    metadata.create_all(bind=conn)
+    for table, missing in plans:
+        if missing is None:
+            # Empty, so nothing is lost by recreating it with the declared columns
+            table.drop(conn)
+            table.create(conn)
+            continue
+        for column in missing:
+            ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {conn.dialect.identifier_preparer.format_table(table)} ADD COLUMN {ddl}")
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
+    return []
+
+def ensure_schema(engine: Engine, metadata: MetaData) -> bool:
+    """Create missing tables, columns and indexes only when the stored schema stamp is stale.
+
+    SQLite keeps the stamp in ``PRAGMA user_version``, so an up-to-date
+    database costs a single pragma read instead of table reflection. Repeated
+    calls in the same process are no-ops. Returns True if DDL was issued.
+    Raises ``RuntimeError``, before any DDL and without stamping, when a
+    table with rows needs a column that cannot be added in place.
+    """
+    if str(engine.url) in _checked_engines:
+        return False
+
+    version = schema_version(metadata)
+    use_stamp = engine.dialect.name == "sqlite"
+    if use_stamp:
+        with engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA user_version").scalar() == version:
+                _checked_engines.add(str(engine.url))
+                return False
+
+    with engine.begin() as conn:
+        blocked = upgrade_tables(conn, metadata)
+        if blocked:
+            raise RuntimeError(
+                f"Database schema is out of date and cannot be upgraded in place; "
+                f"migrate these columns: {', '.join(blocked)}"
+            )
+        if use_stamp:
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+    _checked_engines.add(str(engine.url))
+    return True
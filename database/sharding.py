@@ -0,0 +1,92 @@
+import os
+import zlib
+from typing import Any, Dict, Iterable, List
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from core.config_sample import settings
+from database.connection import create_database_engine, engine as default_engine
+from database.schema import ensure_schema
+
+SHARD_KEYS = ("event_id", "object_type")
+
+def shard_index(key: Any, count: int) -> int:
+    """Stable shard for a routing key: crc32 of its string form, modulo ``count``"""
+    return zlib.crc32(str(key).encode("utf-8")) % count
+
+class Shard:
+    """One SQLite file with its own engine, and so its own write lock"""
+    __slots__ = ("index", "engine", "session_factory")
+
+    def __init__(self, index: int, engine: Engine):
+        self.index = index
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class ShardSet:
+    """Routes rows to N SQLite files by a hash of ``event_id`` or by ``object_type``.
+
+    A set of one shard is the unsharded database. Quarantine and other
+    control tables stay in the main database.
+    """
+
+    def __init__(self, engines: List[Engine], key: str = "event_id"):
+        if not engines:
+            raise ValueError("A shard set needs at least one engine")
+        if key not in SHARD_KEYS:
+            raise ValueError(f"Unsupported shard key: {key} (expected one of {SHARD_KEYS})")
+        self.shards = [Shard(index, engine) for index, engine in enumerate(engines)]
+        self.key = key
+
+    @classmethod
+    def from_layout(cls, count: int, path_template: str, key: str = "event_id") -> "ShardSet":
+        """Open ``count`` shard files named by ``path_template``; 0 or 1 means the main database"""
+        if count <= 1:
+            return cls([default_engine], key)
+        engines = []
+        for index in range(count):
+            path = path_template.format(index=index)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            engines.append(create_database_engine(f"sqlite:///{path}"))
+        return cls(engines, key)
+
+    @property
+    def count(self) -> int:
+        return len(self.shards)
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.shards) > 1
+
+    def route(self, record: Dict[str, Any]) -> int:
+        """Shard index of a decoded message or row"""
+        if not self.sharded:
+            return 0
+        return shard_index(record.get(self.key), len(self.shards))
+
+    def for_key(self, value: Any) -> Shard:
+        """The shard a routing key value maps to"""
+        return self.shards[shard_index(value, len(self.shards))] if self.sharded else self.shards[0]
+
+    def split(self, records: Iterable[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        """Group records by shard, keeping their order within each shard"""
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(self.route(record), []).append(record)
+        return groups
+
+    def ensure_schema(self, metadata) -> bool:
+        """Create missing tables on every shard; True if any DDL was issued"""
+        created = False
+        for shard in self.shards:
+            created = ensure_schema(shard.engine, metadata) or created
+        return created
+
+    def dispose(self) -> None:
+        for shard in self.shards:
+            if shard.engine is not default_engine:
+                shard.engine.dispose()
+
+# Storage layout of this process
+shards = ShardSet.from_layout(settings.SHARD_COUNT, settings.SHARD_PATH_TEMPLATE, settings.SHARD_KEY)
@@ -1,15 +1,28 @@
+# Imported first so startup phases are timed from process start
+from consumer_utils.startup_timer import startup_timer
 import asyncio
 import signal
 import sys
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from consumer_service.kafka_consumer import KafkaConsumerService
+from consumer_service.quarantine_replay import QuarantineReplayService
 from consumer_utils.logger import setup_logger
-from database import Base, engine
+from database import Base, engine, SessionLocal, ensure_schema, shards
 from consumer_entities.opportunity_model import Opportunity
 from consumer_entities.project_model import Project
+from consumer_entities.quarantine_model import QuarantinedMessage
+from consumer_repository.quarantine_repository import QuarantineRepository
 from consumer_utils.log_cleanup import cleanup_logs
+from consumer_utils.periodic import run_periodically
+from consumer_utils.sampling_profiler import ProfilerBusyError, profiler
+from consumer_utils.tombstone_compaction import compact_tombstones
+from core.config_sample import settings
+
+startup_timer.mark("imports")
 
 # Create FastAPI app
 app = FastAPI(title="Kafka Consumer Service")
@@ -20,25 +33,59 @@ logger = setup_logger(__name__)
 # Global consumer service instance
 consumer_service: Optional[KafkaConsumerService] = None
 
+# Periodic maintenance tasks
+background_tasks: List[asyncio.Task] = []
+
+def start_background_tasks() -> None:
+    """Schedule periodic maintenance jobs on the running event loop"""
+    background_tasks.append(asyncio.create_task(run_periodically(
+        cleanup_logs,
+        settings.LOG_CLEANUP_INTERVAL_SECONDS,
+        "log_cleanup",
+        initial_delay=settings.MAINTENANCE_INITIAL_DELAY_SECONDS
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        compact_tombstones,
+        settings.TOMBSTONE_COMPACTION_INTERVAL_SECONDS,
+        "tombstone_compaction",
+        initial_delay=settings.MAINTENANCE_INITIAL_DELAY_SECONDS
+    )))
+
+async def start_services() -> None:
+    """Check the schema, start the consumer and schedule maintenance"""
+    global consumer_service
+
+    # Create database tables only if the schema stamp changed
+    if ensure_schema(engine, Base.metadata):
+        logger.info("Database tables created successfully")
+    if shards.sharded and shards.ensure_schema(Base.metadata):
+        logger.info(f"Database tables created on {shards.count} shards")
+    startup_timer.mark("schema_ready")
+
+    if consumer_service is None:
+        consumer_service = KafkaConsumerService()
+        await consumer_service.start()
+        start_background_tasks()
+    startup_timer.mark("consumer_started")
+    startup_timer.check_budget("consumer_started")
+
+async def stop_services() -> None:
+    """Cancel maintenance tasks and stop the consumer"""
+    global consumer_service
+
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+
+    if consumer_service:
+        await consumer_service.stop()
+        consumer_service = None
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global consumer_service
-    
     try:
-        # Create database tables
-        Base.metadata.create_all(bind=engine)
-        
-        # Clean up old logs on startup
-        cleanup_logs()
-        logger.info("Log cleanup completed")
-        
-        # Initialize consumer service
-        consumer_service = KafkaConsumerService()
-        
-        # Start consumer service
-        await consumer_service.start()
-        
+        await start_services()
         logger.info("Kafka consumer service started successfully")
     except Exception as e:
         logger.error(f"Failed to start services: {str(e)}")
@@ -47,20 +94,122 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    global consumer_service
-    
-    if consumer_service:
-        try:
-            await consumer_service.stop()
-            logger.info("Kafka consumer service stopped successfully")
-        except Exception as e:
-            logger.error(f"Error stopping consumer service: {str(e)}")
+    try:
+        await stop_services()
+        logger.info("Kafka consumer service stopped successfully")
+    except Exception as e:
+        logger.error(f"Error stopping consumer service: {str(e)}")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/admin/partitions")
+async def partition_report():
+    """State of the partitions currently assigned to this consumer"""
+    if consumer_service is None:
+        raise HTTPException(status_code=503, detail="Consumer service is not running")
+    return {str(tp): state.dict() for tp, state in consumer_service.partition_state.items()}
+
+@app.get("/admin/lanes")
+async def lane_report():
+    """Queue depth, in-flight batches and latency of each scheduling lane"""
+    if consumer_service is None:
+        raise HTTPException(status_code=503, detail="Consumer service is not running")
+    return consumer_service.lane_scheduler.snapshot()
+
+@app.post("/admin/profile", response_class=PlainTextResponse)
+async def profile_process(seconds: float = 10.0, interval_ms: Optional[int] = None):
+    """Sample the process for a bounded time and return folded stacks for a flamegraph"""
+    if seconds <= 0 or seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {settings.PROFILER_MAX_SECONDS}]")
+    interval = (interval_ms or settings.PROFILER_DEFAULT_INTERVAL_MS) / 1000
+    try:
+        return await asyncio.to_thread(profiler.profile, seconds, interval)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/admin/slow-messages")
+async def slow_messages():
+    """Per-stage timings of recent messages and batches over SLOW_MESSAGE_THRESHOLD_MS"""
+    if consumer_service is None:
+        raise HTTPException(status_code=503, detail="Consumer service is not running")
+    return consumer_service.slow_message_tracer.snapshot()
+
+@app.get("/admin/batching")
+async def batching_report():
+    """Current adaptive batch size, linger time and the inputs behind them"""
+    if consumer_service is None:
+        raise HTTPException(status_code=503, detail="Consumer service is not running")
+    return consumer_service.batch_controller.snapshot()
+
+@app.get("/admin/startup")
+async def startup_report():
+    """Elapsed time from process start to each startup phase"""
+    return startup_timer.report()
+
+@app.get("/admin/ingest-stats")
+async def ingest_stats():
+    """Applied versus skipped (unchanged) upserts per object type"""
+    if consumer_service is None:
+        raise HTTPException(status_code=503, detail="Consumer service is not running")
+    return consumer_service.processing_service.stats
+
+@app.get("/admin/quarantine")
+def list_quarantined_messages(
+    object_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    topic: Optional[str] = None,
+    partition: Optional[int] = None,
+    include_replayed: bool = False,
+    after_id: int = 0,
+    limit: int = 100
+):
+    """List quarantined messages matching the filters; a plain def, so FastAPI runs it in its threadpool"""
+    db = SessionLocal()
+    try:
+        entries = QuarantineRepository(db).find(
+            object_type=object_type,
+            since=since,
+            until=until,
+            topic=topic,
+            partition=partition,
+            include_replayed=include_replayed,
+            after_id=after_id,
+            limit=limit
+        )
+        return [entry.dict() for entry in entries]
+    finally:
+        db.close()
+
+@app.post("/admin/quarantine/replay")
+async def replay_quarantined_messages(
+    object_type: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    topic: Optional[str] = None,
+    partition: Optional[int] = None,
+    batch_size: int = 100,
+    limit: Optional[int] = None
+):
+    """Replay quarantined messages of an object type through the pipeline"""
+    if consumer_service is None:
+        raise HTTPException(status_code=503, detail="Consumer service is not running")
+    try:
+        return await QuarantineReplayService(consumer_service).replay(
+            object_type=object_type,
+            since=since,
+            until=until,
+            topic=topic,
+            partition=partition,
+            batch_size=batch_size,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 async def shutdown(signal: signal.Signals, loop: asyncio.AbstractEventLoop, consumer_service: Optional[KafkaConsumerService] = None):
     """Cleanup tasks tied to the service's shutdown."""
     logger.info(f"Received exit signal {signal.name}...")
@@ -85,14 +234,6 @@ def handle_exception(loop: asyncio.AbstractEventLoop, context: dict):
 
 async def main():
     try:
-        # Create database tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-
-        # Clean up old logs on startup
-        cleanup_logs()
-        logger.info("Log cleanup completed")
-
         # Create event loop
         loop = asyncio.get_event_loop()
         
@@ -100,15 +241,14 @@ async def main():
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(
                 sig,
-                lambda s=sig: asyncio.create_task(shutdown(s, loop))
+                lambda s=sig: asyncio.create_task(shutdown(s, loop, consumer_service))
             )
         
         # Set exception handler
         loop.set_exception_handler(handle_exception)
         
         # Initialize and start consumer service
-        consumer_service = KafkaConsumerService()
-        await consumer_service.start()
+        await start_services()
         
         # Keep the main loop running
         while True:
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from consumer_business.processing_service import ProcessingService
+from consumer_entities.project_model import Project
+from core.constants_sample import WRITE_PATH_CORE, WRITE_PATH_ORM
+from database import Base
+
+@pytest.fixture(params=[WRITE_PATH_CORE, WRITE_PATH_ORM])
+def write(request, tmp_path):
+    """Write Project messages in one committed batch on both write paths"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'upserts.db'}")
+    Base.metadata.create_all(bind=engine)
+    service = ProcessingService(write_path=request.param)
+    db = Session(bind=engine, autoflush=False)
+
+    def write(*messages):
+        counts = service.write_registered(list(messages), db)
+        db.commit()
+        return counts["Project"]
+
+    write.row = lambda event_id: db.query(Project).filter(Project.event_id == event_id).one()
+    yield write
+    db.close()
+    engine.dispose()
@@ -0,0 +1,10 @@
+def project(event_id, version, name=None):
+    """A Project message, versioned unless ``version`` is None"""
+    payload = {
+        "object_type": "Project", "event_id": event_id, "name": name or f"{event_id}-v{version}",
+        "status": "s", "start_date": "2024-01-01", "end_date": "2024-02-01", "budget": 1,
+        "manager_id": "m", "client_id": "c"
+    }
+    if version is not None:
+        payload["version"] = version
+    return payload
@@ -0,0 +1,67 @@
+from consumer_utils.adaptive_batch import AdaptiveBatchController
+
+def controller(**overrides):
+    settings = dict(
+        initial_size=100, min_size=10, max_size=200, target_latency_ms=50, increase_step=50,
+        decrease_factor=0.5, max_error_rate=0.5, min_linger_ms=0, max_linger_ms=20, linger_step_ms=5
+    )
+    settings.update(overrides)
+    return AdaptiveBatchController(**settings)
+
+def test_initial_size_is_clamped():
+    assert controller(initial_size=5).batch_size == 10
+    assert controller(initial_size=500).batch_size == 200
+
+def test_full_fast_batches_grow_up_to_max_size():
+    batches = controller()
+    assert batches.observe(100, 0.01) == "increase"
+    assert batches.batch_size == 150
+    batches.observe(150, 0.01)
+    batches.observe(200, 0.01)
+    assert batches.batch_size == 200
+    assert batches.increases == 3
+
+def test_underfilled_batches_linger_up_to_max_linger():
+    batches = controller()
+    assert batches.observe(30, 0.01) == "linger"
+    assert (batches.batch_size, batches.linger_ms) == (100, 5)
+    for _ in range(10):
+        batches.observe(30, 0.01)
+    assert batches.linger_ms == 20
+    assert batches.observe(100, 0.01) == "increase"
+    assert batches.linger_ms == 15
+    assert batches.observe(0, 0.0) == "hold"
+
+def test_slow_or_failed_batches_shrink_down_to_min_size():
+    batches = controller()
+    batches.observe(30, 0.01)
+    assert batches.observe(100, 0.2) == "decrease"
+    assert (batches.batch_size, batches.linger_ms) == (50, 2.5)
+    assert batches.observe(10, 0.01, failed=True) == "decrease"
+    for _ in range(5):
+        batches.observe(100, 0.2)
+    assert batches.batch_size == 10
+    assert batches.decreases == 7
+
+def test_a_high_error_rate_keeps_shrinking_after_the_failures():
+    batches = controller(max_error_rate=0.2, smoothing=0.5)
+    batches.observe(100, 0.01, failed=True)
+    assert batches.error_rate == 0.5
+    assert batches.observe(100, 0.01) == "decrease"
+    assert batches.observe(100, 0.01) == "increase"
+
+def test_a_batch_that_fills_its_capacity_counts_as_full():
+    batches = controller()
+    assert batches.observe(40, 0.01, capacity=40) == "increase"
+    assert batches.history[-1]["capacity"] == 40
+    assert batches.observe(40, 0.01, capacity=80) == "linger"
+    # A capacity above the batch size does not lower the bar
+    assert batches.observe(150, 0.01, capacity=1000) == "increase"
+
+def test_disabled_controller_only_tracks_latency():
+    batches = controller(enabled=False)
+    assert batches.observe(100, 0.01) == "hold"
+    assert batches.observe(100, 1.0, failed=True) == "hold"
+    assert (batches.batch_size, batches.linger_ms) == (100, 0)
+    assert batches.latency_ms > 0 and batches.error_rate > 0
+    assert batches.snapshot()["history"] == []
@@ -0,0 +1,338 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from aiokafka import TopicPartition
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError, StatementError
+
+from consumer_service import kafka_consumer
+from consumer_service.kafka_consumer import KafkaConsumerService, is_data_error
+from core.constants_sample import QUARANTINE_REASON_INVALID_FIELDS, QUARANTINE_REASON_WRITE_FAILED
+
+TOPIC = "sales_events"
+
+def project(event_id):
+    return {
+        "object_type": "Project", "event_id": event_id, "name": "n", "status": "s",
+        "start_date": "2024-01-01", "end_date": "2024-02-01", "budget": 1,
+        "manager_id": "m", "client_id": "c"
+    }
+
+def opportunity(event_id):
+    return {
+        "object_type": "Opportunity", "event_id": event_id, "name": "n", "stage": "s",
+        "amount": 1, "probability": 0.5, "expected_close_date": "2024-01-01",
+        "account_id": "a", "owner_id": "u"
+    }
+
+def message(offset, payload, partition=0):
+    return SimpleNamespace(
+        topic=TOPIC, partition=partition, offset=offset,
+        value=payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8"), headers=[]
+    )
+
+class FakeConsumer:
+    def __init__(self):
+        self.commits = []
+        self.seeks = []
+
+    async def commit(self, offsets):
+        self.commits.append(dict(offsets))
+
+    def seek(self, tp, offset):
+        self.seeks.append((tp, offset))
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(kafka_consumer, "RETRY_DELAY", 0)
+    service = KafkaConsumerService()
+    service.consumer = FakeConsumer()
+    service.settings = SimpleNamespace(**{
+        **service.settings.__dict__, "OFFSET_STORE_ENABLED": False, "LANE_MAX_BATCH_ATTEMPTS": 3
+    })
+    service.written = []
+    service.failing = set()
+    service.error = ValueError("write failed")
+    service.quarantined = []
+    service.quarantine_stored = True
+    service.stored_offsets = []
+
+    async def write_records(records, timings=None, offsets=None):
+        if service.failing & {record["event_id"] for record in records}:
+            raise service.error
+        service.written.extend(record["event_id"] for record in records)
+        if offsets is not None:
+            service.stored_offsets.append(offsets())
+        return {}
+
+    service.write_records = write_records
+    service.write_batch = write_records
+    async def store_quarantined(entries):
+        service.quarantine_inserts += 1
+        if not service.quarantine_stored:
+            raise RuntimeError("database is locked")
+        service.quarantined.extend((entry["payload"].get("event_id"), entry["reason"], entry["error"]) for entry in entries)
+
+    service.quarantine_inserts = 0
+    service.store_quarantined = store_quarantined
+    return service
+
+def run_lane_batch(service):
+    picked = service._pick_lane_batch()
+    assert picked is not None
+    return service.start_lane_batch(*picked)
+
+async def wait_until(condition):
+    while not condition():
+        await asyncio.sleep(0.005)
+
+def test_lanes_finishing_out_of_order_commit_the_lowest_pending_offset(service):
+    async def scenario():
+        # Offsets 0-1 go to the bulk lane, 2-3 to the realtime lane
+        batch = [message(0, project("p0")), message(1, project("p1")),
+                 message(2, opportunity("o2")), message(3, opportunity("o3"))]
+        await service.enqueue_batch({(TOPIC, 0): batch})
+        realtime = service.lane_scheduler.lanes["realtime"]
+        bulk = service.lane_scheduler.lanes["bulk"]
+
+        items = realtime.take(10)
+        await service.start_lane_batch(realtime, items)
+        assert service.watermarks.committable((TOPIC, 0)) == 0
+        await service.commit_pending()
+        assert service.consumer.commits == [{(TOPIC, 0): 0}]
+
+        await service.start_lane_batch(bulk, bulk.take(10))
+        assert service.watermarks.committable((TOPIC, 0)) == 4
+        await service.commit_pending()
+        assert service.consumer.commits[-1] == {(TOPIC, 0): 4}
+
+    asyncio.run(scenario())
+
+def test_stored_offsets_trail_a_lane_still_in_flight_on_the_partition(service):
+    async def scenario():
+        service.settings.OFFSET_STORE_ENABLED = True
+        batch = [message(0, project("p0")), message(1, project("p1")),
+                 message(2, opportunity("o2")), message(3, opportunity("o3"))]
+        await service.enqueue_batch({(TOPIC, 0): batch})
+        realtime = service.lane_scheduler.lanes["realtime"]
+        bulk = service.lane_scheduler.lanes["bulk"]
+        realtime_items, bulk_items = realtime.take(10), bulk.take(10)
+        assert service._stored_offsets(bulk_items) == {(TOPIC, 0): 2}
+
+        # Offsets 0-1 are still in flight in the bulk lane, so 2-3 store offset 0
+        await service.start_lane_batch(realtime, realtime_items)
+        await service.start_lane_batch(bulk, bulk_items)
+        assert service.stored_offsets == [{(TOPIC, 0): 0}, {(TOPIC, 0): 4}]
+
+    asyncio.run(scenario())
+
+def test_process_message_goes_through_the_lanes(service):
+    async def scenario():
+        await service.process_message(message(0, project("p0")))
+        assert len(service.lane_scheduler.lanes["bulk"].queue) == 1
+        await run_lane_batch(service)
+        assert service.written == ["p0"]
+        assert service.watermarks.committable((TOPIC, 0)) == 1
+
+    asyncio.run(scenario())
+
+def test_failed_batch_is_requeued_in_order_and_kept_pending(service):
+    async def scenario():
+        await service.enqueue_batch({(TOPIC, 0): [message(offset, project(f"p{offset}")) for offset in range(3)]})
+        service.failing = {"p1"}
+        await run_lane_batch(service)
+        bulk = service.lane_scheduler.lanes["bulk"]
+        assert [item[1].offset for item in bulk.queue] == [0, 1, 2]
+        assert not bulk.busy_partitions and bulk.in_flight == 0
+        assert service.watermarks.committable((TOPIC, 0)) == 0
+
+        service.failing = set()
+        await run_lane_batch(service)
+        assert service.written == ["p0", "p1", "p2"]
+        assert service.watermarks.committable((TOPIC, 0)) == 3
+        assert not service._write_attempts
+
+    asyncio.run(scenario())
+
+def test_poison_record_is_quarantined_after_max_attempts(service):
+    async def scenario():
+        await service.enqueue_batch({(TOPIC, 0): [message(offset, project(f"p{offset}")) for offset in range(3)]})
+        service.failing = {"p1"}
+        for _ in range(service.settings.LANE_MAX_BATCH_ATTEMPTS):
+            await run_lane_batch(service)
+        assert service.written == ["p0", "p2"]
+        assert service.quarantined == [("p1", QUARANTINE_REASON_WRITE_FAILED, "write failed")]
+        assert service.lane_scheduler.queued() == 0
+        assert service.watermarks.committable((TOPIC, 0)) == 3
+        assert not service._write_attempts
+
+    asyncio.run(scenario())
+
+def test_only_data_errors_count_as_poison():
+    assert is_data_error(IntegrityError("INSERT", {}, Exception("NOT NULL constraint failed")))
+    assert is_data_error(StatementError("bind failed", "INSERT", {}, TypeError("not a date")))
+    assert is_data_error(TypeError("SQLite Date type only accepts Python date objects"))
+    assert not is_data_error(OperationalError("INSERT", {}, Exception("database is locked")))
+    assert not is_data_error(RuntimeError("connection reset"))
+    assert not is_data_error(ProgrammingError("SELECT", {}, Exception("Cannot operate on a closed database.")))
+
+def test_unbindable_values_rejected_by_the_upsert_are_data_errors(write):
+    bad = project("p0")
+    bad["name"] = {"a": 1}
+    with pytest.raises(StatementError) as raised:
+        write(bad)
+    assert is_data_error(raised.value)
+
+def test_transient_errors_stay_pending_after_max_attempts(service):
+    async def scenario():
+        await service.enqueue_batch({(TOPIC, 0): [message(offset, project(f"p{offset}")) for offset in range(3)]})
+        service.failing = {"p1"}
+        service.error = OperationalError("UPDATE projects", {}, Exception("database is locked"))
+        for _ in range(service.settings.LANE_MAX_BATCH_ATTEMPTS + 1):
+            await run_lane_batch(service)
+        # p0 is written on its own; p1 and everything after it wait in order
+        assert service.written == ["p0"]
+        assert not service.quarantined
+        assert [item[1].offset for item in service.lane_scheduler.lanes["bulk"].queue] == [1, 2]
+        assert service.watermarks.committable((TOPIC, 0)) == 1
+
+        service.failing = set()
+        await run_lane_batch(service)
+        assert service.written == ["p0", "p1", "p2"]
+        assert service.watermarks.committable((TOPIC, 0)) == 3
+
+    asyncio.run(scenario())
+
+def test_record_stays_pending_when_its_quarantine_fails(service):
+    async def scenario():
+        await service.enqueue_batch({(TOPIC, 0): [message(offset, project(f"p{offset}")) for offset in range(2)]})
+        service.failing = {"p0"}
+        service.quarantine_stored = False
+        for _ in range(service.settings.LANE_MAX_BATCH_ATTEMPTS):
+            await run_lane_batch(service)
+        assert service.written == []
+        assert service.lane_scheduler.queued() == 2
+        assert service.watermarks.committable((TOPIC, 0)) == 0
+
+        service.quarantine_stored = True
+        await run_lane_batch(service)
+        assert service.written == ["p1"]
+        assert service.quarantined == [("p0", QUARANTINE_REASON_WRITE_FAILED, "write failed")]
+        assert service.watermarks.committable((TOPIC, 0)) == 2
+
+    asyncio.run(scenario())
+
+def test_invalid_messages_complete_without_reaching_a_lane(service):
+    async def scenario():
+        bad = project("p1")
+        bad["budget"] = "abc"
+        await service.enqueue_batch({(TOPIC, 0): [message(0, project("p0")), message(1, bad)]})
+        assert service.quarantined[0][0] == "p1"
+        assert service.lane_scheduler.queued() == 1
+        await run_lane_batch(service)
+        assert service.watermarks.committable((TOPIC, 0)) == 2
+
+    asyncio.run(scenario())
+
+def test_objects_in_string_fields_are_quarantined_before_the_write(service):
+    async def scenario():
+        bad = project("p1")
+        bad["name"] = {"a": 1}
+        numeric = project("p2")
+        numeric["manager_id"] = 42
+        numeric["meta_data"] = {"tags": ["a"]}
+        await service.enqueue_batch({(TOPIC, 0): [message(0, project("p0")), message(1, bad), message(2, numeric)]})
+        assert service.quarantined == [("p1", QUARANTINE_REASON_INVALID_FIELDS, "name: Expected a string, got dict")]
+        assert service.lane_scheduler.queued() == 2
+
+        written = []
+        write_records = service.write_records
+        async def capture(records, timings=None, offsets=None):
+            written.extend(records)
+            return await write_records(records, timings, offsets)
+        service.write_batch = capture
+        await run_lane_batch(service)
+        assert written[1]["manager_id"] == "42"
+        assert written[1]["meta_data"] == {"tags": ["a"]}
+
+    asyncio.run(scenario())
+
+def test_fetch_is_quarantined_in_one_insert(service):
+    async def scenario():
+        unknown = [message(offset, {"object_type": "Account", "event_id": f"a{offset}"}) for offset in range(3)]
+        bad = project("p4")
+        bad["budget"] = "abc"
+        await service.enqueue_batch({(TOPIC, 0): unknown + [message(3, b"not json"), message(4, bad)]})
+        assert service.quarantine_inserts == 1
+        assert [entry[0] for entry in service.quarantined] == ["a0", "a1", "a2", None, "p4"]
+        assert service.watermarks.committable((TOPIC, 0)) == 5
+
+    asyncio.run(scenario())
+
+def test_failed_quarantine_insert_keeps_the_fetch_pending(service):
+    async def scenario():
+        service.quarantine_stored = False
+        batch = [message(0, project("p0")), message(1, {"object_type": "Account", "event_id": "a1"})]
+        with pytest.raises(RuntimeError):
+            await service.enqueue_batch({(TOPIC, 0): batch})
+        assert service.lane_scheduler.queued() == 0
+        assert service.watermarks.committable((TOPIC, 0)) == 0
+
+    asyncio.run(scenario())
+
+def test_drain_drops_queued_messages_of_revoked_partitions(service):
+    async def scenario():
+        await service.enqueue_batch({
+            (TOPIC, 0): [message(0, project("a0")), message(1, project("a1"))],
+            (TOPIC, 1): [message(0, project("b0"), partition=1)]
+        })
+        bulk = service.lane_scheduler.lanes["bulk"]
+        bulk.busy_partitions[(TOPIC, 0)] = 1
+        await run_lane_batch(service)
+        assert service.written == ["b0"]
+
+        del bulk.busy_partitions[(TOPIC, 0)]
+        revoked = TopicPartition(TOPIC, 0)
+        await service.drain_partitions([revoked])
+        assert service.lane_scheduler.queued() == 0
+        # Nothing of the revoked partition was written, so its commit stays at 0
+        assert service.consumer.commits == [{revoked: 0}]
+        assert service.watermarks.committable(revoked) is None
+        assert service.watermarks.committable((TOPIC, 1)) == 1
+
+    asyncio.run(scenario())
+
+def test_failed_enqueue_rewinds_the_fetch(service, monkeypatch):
+    async def scenario():
+        service.partition_state[(TOPIC, 0)] = SimpleNamespace(committed_offset=None)
+        monkeypatch.setattr(service, "validate_routed", lambda routed, quarantined=None: 1 / 0)
+        batches = {(TOPIC, 0): [message(5, project("p5")), message(6, project("p6"))]}
+        with pytest.raises(ZeroDivisionError):
+            await service.enqueue_batch(batches)
+        service._rewind(batches)
+        assert service.consumer.seeks == [((TOPIC, 0), 5)]
+        assert service.watermarks.committable((TOPIC, 0)) == 5
+
+    asyncio.run(scenario())
+
+def test_dispatch_wakes_up_when_a_lane_batch_finishes(service):
+    async def scenario():
+        service.settings.LANE_MAX_CONCURRENT_BATCHES = 1
+        written = service.write_records
+
+        async def slow_write(records, timings=None, offsets=None):
+            await asyncio.sleep(0.01)
+            return await written(records, timings, offsets)
+
+        service.write_batch = slow_write
+        # More than one bulk lane batch, with nothing fetched afterwards
+        await service.enqueue_batch({(TOPIC, 0): [message(offset, project(f"p{offset}")) for offset in range(120)]})
+        dispatcher = asyncio.create_task(service.dispatch())
+        try:
+            await asyncio.wait_for(wait_until(lambda: len(service.written) == 120), timeout=2)
+        finally:
+            dispatcher.cancel()
+        assert service.watermarks.committable((TOPIC, 0)) == 120
+
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from consumer_service.lane_scheduler import Lane, WeightedFairScheduler
+
+def message(partition, offset, topic="sales_events"):
+    return SimpleNamespace(topic=topic, partition=partition, offset=offset)
+
+def fill(scheduler, lane, count, partition=0, start=0):
+    for offset in range(start, start + count):
+        scheduler.enqueue(lane, message(partition, offset), {"offset": offset}, {})
+
+def make_scheduler(quantum=10, **realtime):
+    realtime = Lane("realtime", object_types=["Opportunity"], weight=4, **realtime)
+    bulk = Lane("bulk", object_types=["Project"], weight=1)
+    return WeightedFairScheduler([realtime, bulk], Lane("default"), quantum=quantum), realtime, bulk
+
+def test_classify_prefers_object_type_then_topic():
+    topic_lane = Lane("audit", topics=["audit_events"])
+    scheduler = WeightedFairScheduler([Lane("realtime", object_types=["Opportunity"]), topic_lane], Lane("default"))
+    assert scheduler.classify("Opportunity", "audit_events").name == "realtime"
+    assert scheduler.classify("Project", "audit_events") is topic_lane
+    assert scheduler.classify("Project", "sales_events") is scheduler.default_lane
+
+def test_from_config_adds_default_lane_and_rejects_duplicates():
+    scheduler = WeightedFairScheduler.from_config([{"name": "bulk", "object_types": ["Project"]}])
+    assert set(scheduler.lanes) == {"bulk", "default"}
+    with pytest.raises(ValueError):
+        WeightedFairScheduler([Lane("a"), Lane("a")], Lane("default"))
+
+def test_deficit_round_robin_shares_by_weight():
+    scheduler, realtime, bulk = make_scheduler()
+    fill(scheduler, realtime, 1000, partition=0)
+    fill(scheduler, bulk, 1000, partition=1)
+
+    served = {"realtime": 0, "bulk": 0}
+    for _ in range(50):
+        lane, items, limit = scheduler.next_batch(max_size=1000)
+        assert len(items) <= limit == lane.weight * scheduler.quantum
+        served[lane.name] += len(items)
+    assert served["realtime"] == 4 * served["bulk"]
+
+def test_batch_limit_is_capped_by_max_size():
+    scheduler, realtime, _ = make_scheduler(quantum=100)
+    fill(scheduler, realtime, 1000)
+    lane, items, limit = scheduler.next_batch(max_size=30)
+    assert lane is realtime and len(items) == limit == 30
+
+def test_overdue_lane_is_served_first():
+    scheduler, realtime, bulk = make_scheduler(latency_target_ms=100)
+    fill(scheduler, bulk, 50, partition=1)
+    fill(scheduler, realtime, 5, partition=0)
+    # The realtime messages have waited past half their latency target
+    realtime.queue = type(realtime.queue)(
+        (enqueued_at - 0.06, msg, data, stages) for enqueued_at, msg, data, stages in realtime.queue
+    )
+    scheduler._cursor = list(scheduler.lanes).index("bulk")
+    lane, items, limit = scheduler.next_batch(max_size=500)
+    assert lane is realtime and len(items) == 5 and limit == 500
+
+def test_lane_holds_back_busy_partitions_in_order():
+    scheduler, realtime, _ = make_scheduler()
+    fill(scheduler, realtime, 3, partition=0)
+    fill(scheduler, realtime, 3, partition=1)
+    realtime.busy_partitions[("sales_events", 0)] = 1
+    items = realtime.take(10)
+    assert [(item[1].partition, item[1].offset) for item in items] == [(1, 0), (1, 1), (1, 2)]
+    assert [item[1].offset for item in realtime.queue] == [0, 1, 2]
+
+def test_lane_at_concurrency_is_not_dispatched():
+    scheduler, realtime, bulk = make_scheduler()
+    fill(scheduler, realtime, 10)
+    realtime.in_flight = realtime.concurrency
+    assert scheduler.next_batch(max_size=100) is None
+    fill(scheduler, bulk, 10, partition=1)
+    lane, _, _ = scheduler.next_batch(max_size=100)
+    assert lane is bulk
+
+def test_drop_removes_revoked_partitions_only():
+    scheduler, realtime, bulk = make_scheduler()
+    fill(scheduler, realtime, 5, partition=0)
+    fill(scheduler, realtime, 5, partition=1)
+    fill(scheduler, bulk, 5, partition=0)
+    assert scheduler.drop([("sales_events", 0)]) == 10
+    assert scheduler.queued() == 5
+    assert all(item[1].partition == 1 for item in realtime.queue)
+
+def test_record_counts_target_misses():
+    lane = Lane("realtime", latency_target_ms=100)
+    lane.record([50.0, 150.0, 250.0])
+    lane.record([], failed=True)
+    snapshot = lane.snapshot()
+    assert snapshot["written"] == 3 and snapshot["batches"] == 2
+    assert snapshot["failed_batches"] == 1 and snapshot["target_misses"] == 2
+    assert lane.oldest_wait_ms(time.monotonic()) == 0.0
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiokafka import TopicPartition
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from consumer_repository.offset_repository import OffsetRepository
+from consumer_service.kafka_consumer import KafkaConsumerService
+from database import Base, ShardSet
+
+TOPIC = "sales_events"
+GROUP = "consumer-group"
+
+class FakeConsumer:
+    def __init__(self, committed):
+        self._committed = committed
+        self.seeks = []
+
+    async def committed(self, tp):
+        return self._committed.get(tp.partition)
+
+    def seek(self, tp, offset):
+        self.seeks.append((tp.partition, offset))
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'offsets.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+def save(engine, offsets):
+    with Session(bind=engine) as db:
+        OffsetRepository(db).save(GROUP, offsets)
+        db.commit()
+
+def stored(engine, partition):
+    with Session(bind=engine) as db:
+        return OffsetRepository(db).get(GROUP, TOPIC, partition)
+
+def test_save_never_moves_an_offset_backwards(engine):
+    save(engine, {(TOPIC, 0): 10, (TOPIC, 1): 3})
+    save(engine, {(TOPIC, 0): 7, (TOPIC, 1): 5})
+    assert (stored(engine, 0), stored(engine, 1)) == (10, 5)
+    save(engine, {(TOPIC, 0): 12})
+    assert stored(engine, 0) == 12
+    assert stored(engine, 2) is None
+
+def test_warm_partitions_seeks_only_when_the_stored_offset_is_ahead(engine):
+    # Partition 0 is ahead of Kafka, 1 behind it, 2 has no Kafka commit, 3 nothing stored, 4 matches
+    save(engine, {(TOPIC, 0): 10, (TOPIC, 1): 3, (TOPIC, 2): 4, (TOPIC, 4): 6})
+    service = KafkaConsumerService()
+    service.settings = SimpleNamespace(**{**service.settings.__dict__, "OFFSET_STORE_ENABLED": True, "KAFKA_GROUP_ID": GROUP})
+    service.shards = ShardSet([engine])
+    service.consumer = FakeConsumer({0: 5, 1: 8, 3: 2, 4: 6})
+
+    asyncio.run(service.warm_partitions([TopicPartition(TOPIC, partition) for partition in range(5)]))
+    assert service.consumer.seeks == [(0, 10), (2, 4)]
+    assert [service.partition_state[TopicPartition(TOPIC, partition)].restored_offset for partition in range(5)] == [
+        10, None, 4, None, None
+    ]
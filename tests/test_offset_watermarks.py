@@ -0,0 +1,65 @@
+from consumer_service.offset_watermarks import OffsetWatermarks
+
+TP = ("sales_events", 0)
+
+def track(watermarks, offsets, tp=TP):
+    for offset in offsets:
+        watermarks.track(tp, offset)
+
+def test_unknown_partition_has_no_watermark():
+    assert OffsetWatermarks().committable(TP) is None
+
+def test_watermark_stops_at_lowest_pending_offset():
+    watermarks = OffsetWatermarks()
+    track(watermarks, range(10))
+    assert watermarks.committable(TP) == 0
+
+    # A later lane finishes first: nothing can be committed past offset 0
+    for offset in range(5, 10):
+        watermarks.complete(TP, offset)
+    assert watermarks.committable(TP) == 0
+    assert watermarks.in_flight(TP) == 5
+
+    for offset in range(3):
+        watermarks.complete(TP, offset)
+    assert watermarks.committable(TP) == 3
+
+    for offset in range(3, 5):
+        watermarks.complete(TP, offset)
+    assert watermarks.committable(TP) == 10
+    assert watermarks.in_flight(TP) == 0
+
+def test_tracking_twice_keeps_one_pending_entry():
+    watermarks = OffsetWatermarks()
+    track(watermarks, [0, 1, 1])
+    watermarks.complete(TP, 0)
+    watermarks.complete(TP, 1)
+    assert watermarks.committable(TP) == 2
+
+def test_committable_after_assumes_the_batch_is_written():
+    watermarks = OffsetWatermarks()
+    track(watermarks, range(20))
+    assert watermarks.committable_after(TP, range(10)) == 10
+    # Another lane holds offsets 0-9, so this batch cannot move the watermark
+    assert watermarks.committable_after(TP, range(10, 20)) == 0
+    assert watermarks.committable_after(TP, range(20)) == 20
+    assert watermarks.committable_after(("other", 0), [1]) is None
+
+def test_partitions_are_independent():
+    watermarks = OffsetWatermarks()
+    other = ("sales_events", 1)
+    track(watermarks, [0, 1])
+    track(watermarks, [7], tp=other)
+    watermarks.complete(other, 7)
+    assert watermarks.committable(TP) == 0
+    assert watermarks.committable(other) == 8
+
+def test_forget_drops_revoked_partitions():
+    watermarks = OffsetWatermarks()
+    other = ("sales_events", 1)
+    track(watermarks, [0, 1])
+    track(watermarks, [0], tp=other)
+    watermarks.forget([TP])
+    assert watermarks.partitions() == [other]
+    assert watermarks.committable(TP) is None
+    assert watermarks.in_flight(TP) == 0
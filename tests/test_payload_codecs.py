@@ -0,0 +1,95 @@
+import struct
+from datetime import date
+from pathlib import Path
+
+import msgpack
+import pytest
+
+from consumer_utils.payload_codecs import PayloadDecoder, SchemaRegistry, _read_long
+
+SCHEMAS = Path(__file__).resolve().parents[1] / "schemas"
+AVRO = [("content-type", b"application/avro"), ("schema-id", b"opportunity-v1")]
+
+def long(value):
+    """Zigzag varint, as the Avro spec encodes int and long"""
+    value = (value << 1) ^ (value >> 63)
+    out = bytearray()
+    while value & ~0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def string(value):
+    encoded = value.encode("utf-8")
+    return long(len(encoded)) + encoded
+
+def double(value):
+    return struct.pack("<d", value)
+
+def opportunity(version=300, close_days=19737):
+    """An opportunity-v1 record; meta_data is written as one block with a negative count"""
+    meta_data = string("region") + string("emea") + string("tier") + string("gold")
+    return b"".join([
+        string("Opportunity"),
+        long(0),                                   # event_type: null
+        string("o1"),
+        long(1) + long(version),                   # version: long branch
+        string("Deal"),
+        string("proposal"),
+        double(1250.5),
+        double(0.25),
+        long(close_days),                          # expected_close_date: days since the epoch
+        string("acc-1"),
+        string("own-1"),
+        long(1) + string("a description nobody reads"),
+        long(1) + long(-2) + long(len(meta_data)) + meta_data + long(0),
+    ])
+
+@pytest.fixture
+def decoder():
+    wanted = {"object_type", "event_type", "event_id", "version", "name", "stage", "amount",
+              "probability", "expected_close_date", "account_id", "owner_id"}
+    return PayloadDecoder(SchemaRegistry(str(SCHEMAS)), wanted)
+
+def test_zigzag_varints():
+    assert _read_long(b"\x00", 0) == (0, 1)
+    assert _read_long(b"\x01", 0) == (-1, 1)
+    assert _read_long(b"\x02", 0) == (1, 1)
+    assert _read_long(b"\x96\x01", 0) == (75, 2)
+    assert _read_long(b"\xff\x01", 0) == (-128, 2)
+    for value in (63, -64, 64, 300, -300, 2 ** 40, -(2 ** 40)):
+        assert _read_long(long(value), 0) == (value, len(long(value)))
+
+def test_avro_record_skips_unwanted_fields(decoder):
+    assert decoder.decode(opportunity(), AVRO) == {
+        "object_type": "Opportunity", "event_type": None, "event_id": "o1", "version": 300,
+        "name": "Deal", "stage": "proposal", "amount": 1250.5, "probability": 0.25,
+        "expected_close_date": date(2024, 1, 15), "account_id": "acc-1", "owner_id": "own-1"
+    }
+
+def test_avro_full_decode_reads_unions_and_negative_block_counts(decoder):
+    record = decoder.decode(opportunity(version=-7, close_days=-1), AVRO, full=True)
+    assert record["version"] == -7
+    assert record["expected_close_date"] == date(1969, 12, 31)
+    assert record["description"] == "a description nobody reads"
+    assert record["meta_data"] == {"region": "emea", "tier": "gold"}
+
+def test_avro_requires_a_known_schema_id(decoder):
+    with pytest.raises(ValueError, match="schema-id"):
+        decoder.decode(opportunity(), [("content-type", b"application/avro")])
+    with pytest.raises(ValueError, match="Unknown schema id"):
+        decoder.decode(opportunity(), [("content-type", b"application/avro"), ("schema-id", b"opportunity-v9")])
+
+def test_msgpack_payloads(decoder):
+    payload = {"object_type": "Project", "event_id": "p1", "budget": 1.5, "meta_data": {"tags": ["a"]}}
+    assert decoder.decode(msgpack.packb(payload), [("content-type", b"application/msgpack")]) == payload
+
+def test_content_type_ignores_parameters_and_case(decoder):
+    headers = [("Content-Type", b"Application/MsgPack; charset=binary")]
+    assert decoder.content_type(headers) == "application/msgpack"
+    assert decoder.decode(msgpack.packb({"event_id": "p1"}), headers) == {"event_id": "p1"}
+    assert decoder.decode(b'{"event_id": "p1"}', [("content-type", b"application/json; charset=utf-8")]) == {"event_id": "p1"}
+    assert decoder.content_type(None) == "application/json"
+    with pytest.raises(ValueError, match="Unsupported content type"):
+        decoder.decode(b"x", [("content-type", b"text/plain")])
@@ -0,0 +1,47 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from consumer_repository.quarantine_repository import QuarantineRepository
+from database import Base
+
+def test_add_many_inserts_entries_in_one_transaction(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quarantine.db'}")
+    Base.metadata.create_all(bind=engine)
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(conn))
+    db = Session(bind=engine)
+    try:
+        repository = QuarantineRepository(db)
+        repository.add_many([
+            {"payload": {"event_id": f"a{offset}"}, "reason": "unknown_object_type", "object_type": "Account",
+             "topic": "sales_events", "partition": 0, "offset": offset}
+            for offset in range(3)
+        ] + [{"payload": {"raw": "x"}, "reason": "invalid_payload"}])
+        assert len(commits) == 1
+        entries = repository.find(object_type="Account")
+        assert [(entry.source_offset, entry.payload["event_id"]) for entry in entries] == [(0, "a0"), (1, "a1"), (2, "a2")]
+        assert len(repository.find(limit=10)) == 4
+    finally:
+        db.close()
+        engine.dispose()
+
+def test_record_failures_updates_a_page_in_one_transaction(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quarantine.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = Session(bind=engine)
+    try:
+        repository = QuarantineRepository(db)
+        entries = repository.add_many([
+            {"payload": {"event_id": f"p{index}"}, "reason": "write_failed", "object_type": "Project"}
+            for index in range(3)
+        ])
+        commits = []
+        event.listen(engine, "commit", lambda conn: commits.append(conn))
+        repository.record_failures([(entries[0], "still bad"), (entries[2], "still bad")])
+        assert len(commits) == 1
+        assert [(entry.replay_attempts, entry.last_error) for entry in repository.find(object_type="Project")] == [
+            (1, "still bad"), (0, None), (1, "still bad")
+        ]
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from consumer_entities.opportunity_model import Opportunity
+from database import Base, ensure_schema
+
+# The opportunities table as the original service created it, without event_id
+BASELINE_OPPORTUNITIES = """
+CREATE TABLE opportunities (
+    id INTEGER PRIMARY KEY, created_at DATETIME, updated_at DATETIME, deleted_at DATETIME,
+    name VARCHAR NOT NULL, stage VARCHAR NOT NULL, amount FLOAT NOT NULL, probability FLOAT NOT NULL,
+    expected_close_date DATE NOT NULL, account_id VARCHAR NOT NULL, owner_id VARCHAR NOT NULL, meta_data JSON
+)
+"""
+
+def baseline_engine(tmp_path, rows=0):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(BASELINE_OPPORTUNITIES)
+        for index in range(rows):
+            conn.exec_driver_sql(
+                "INSERT INTO opportunities (name, stage, amount, probability, expected_close_date, account_id, owner_id) "
+                f"VALUES ('o{index}', 's', 1, 0.5, '2024-01-01', 'a', 'u')"
+            )
+    return engine
+
+def columns(engine, table):
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+def user_version(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+def test_empty_baseline_table_is_rebuilt(tmp_path):
+    engine = baseline_engine(tmp_path)
+    assert ensure_schema(engine, Base.metadata)
+    assert columns(engine, "opportunities") == {column.name for column in Opportunity.__table__.columns}
+    indexes = {index["name"] for index in inspect(engine).get_indexes("opportunities")}
+    assert {index.name for index in Opportunity.__table__.indexes} <= indexes
+    assert user_version(engine) != 0
+
+def test_table_with_rows_is_left_unchanged_when_it_cannot_be_upgraded(tmp_path):
+    engine = baseline_engine(tmp_path, rows=2)
+    before = columns(engine, "opportunities")
+    with pytest.raises(RuntimeError, match="opportunities.event_id"):
+        ensure_schema(engine, Base.metadata)
+    assert columns(engine, "opportunities") == before
+    assert "projects" not in inspect(engine).get_table_names()
+    assert user_version(engine) == 0
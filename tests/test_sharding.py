@@ -0,0 +1,150 @@
+import zlib
+
+import pytest
+from aiokafka import TopicPartition
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from consumer_business.processing_service import ProcessingService
+from consumer_entities.project_model import Project
+from consumer_repository.offset_repository import OffsetRepository
+from consumer_repository.project_repository import ProjectRepository
+from consumer_repository.sharded_repository import ShardedRepository
+from consumer_service.kafka_consumer import KafkaConsumerService
+from consumer_utils.reshard import reshard
+from core.config_sample import settings
+from core.constants_sample import EVENT_TYPE_DELETE
+from database import Base, ShardSet
+
+TOPIC = "sales_events"
+GROUP = settings.KAFKA_GROUP_ID
+
+def project(event_id, version=1):
+    return {
+        "object_type": "Project", "event_id": event_id, "name": f"{event_id}-v{version}", "status": "s",
+        "start_date": "2024-01-01", "end_date": "2024-02-01", "budget": 1,
+        "manager_id": "m", "client_id": "c", "version": version
+    }
+
+def shard_set(tmp_path, name, count, key="event_id"):
+    shards = ShardSet([create_engine(f"sqlite:///{tmp_path / f'{name}-{index}.db'}") for index in range(count)], key)
+    shards.ensure_schema(Base.metadata)
+    return shards
+
+def write(shard_set, *messages):
+    """Write messages to the shards they route to, one committed batch per shard"""
+    service = ProcessingService()
+    for index, group in shard_set.split(messages).items():
+        db = shard_set.shards[index].session_factory()
+        try:
+            service.write_registered(group, db)
+            db.commit()
+        finally:
+            db.close()
+
+def save_offsets(shard, offsets):
+    db = shard.session_factory()
+    try:
+        OffsetRepository(db).save(GROUP, offsets)
+        db.commit()
+    finally:
+        db.close()
+
+def event_ids(shard):
+    with shard.engine.connect() as conn:
+        return sorted(conn.execute(select(Project.event_id)).scalars())
+
+@pytest.fixture
+def shards(tmp_path):
+    source = shard_set(tmp_path, "source", 3)
+    yield source
+    source.dispose()
+
+def test_route_hashes_the_shard_key(tmp_path, shards):
+    for event_id in ("a", "b", "c", "d"):
+        assert shards.route({"event_id": event_id}) == zlib.crc32(event_id.encode("utf-8")) % 3
+        assert shards.for_key(event_id) is shards.shards[shards.route({"event_id": event_id})]
+    single = shard_set(tmp_path, "single", 1)
+    assert single.route({"event_id": "a"}) == 0
+    by_type = shard_set(tmp_path, "types", 3, key="object_type")
+    assert by_type.route(project("a")) == by_type.route(project("b"))
+
+def test_split_keeps_order_within_each_shard(shards):
+    records = [project(f"e{index}") for index in range(12)]
+    groups = shards.split(records)
+    assert sum(len(group) for group in groups.values()) == len(records)
+    for index, group in groups.items():
+        assert all(shards.route(record) == index for record in group)
+        assert group == [record for record in records if shards.route(record) == index]
+
+def test_sharded_repository_merges_and_pages_by_creation_time(shards):
+    for index in range(10):
+        write(shards, project(f"e{index:02d}"))
+    assert sum(len(event_ids(shard)) for shard in shards.shards) == 10
+    assert len({tuple(event_ids(shard)) for shard in shards.shards}) > 1
+
+    repository = ShardedRepository(ProjectRepository, shards)
+    assert [row.event_id for row in repository.get_all(0, 10)] == [f"e{index:02d}" for index in range(10)]
+    assert [row.event_id for row in repository.get_all(3, 4)] == ["e03", "e04", "e05", "e06"]
+    assert repository.get_by_event_id("e07").name == "e07-v1"
+    assert repository.get_by_event_id("missing") is None
+
+def test_sharded_repository_fans_out_lookups_without_an_event_id_key(tmp_path):
+    by_type = shard_set(tmp_path, "types", 3, key="object_type")
+    write(by_type, project("a"), project("b"))
+    assert ShardedRepository(ProjectRepository, by_type).get_by_event_id("b").event_id == "b"
+
+def test_reshard_moves_rows_to_their_target_shard(tmp_path, shards):
+    write(shards, *[project(f"e{index}", version=2) for index in range(8)])
+    write(shards, {"object_type": "Project", "event_type": EVENT_TYPE_DELETE, "event_id": "e3", "version": 3})
+    target = shard_set(tmp_path, "target", 2)
+
+    counts = reshard(shards, target, chunk_size=3)
+    assert counts["Project"] == 8
+    for shard in target.shards:
+        ids = event_ids(shard)
+        assert ids and all(target.route({"event_id": event_id}) == shard.index for event_id in ids)
+    assert sum(len(event_ids(shard)) for shard in target.shards) == 8
+    moved = target.for_key("e3")
+    with Session(bind=moved.engine) as db:
+        row = db.query(Project).filter(Project.event_id == "e3").one()
+        assert (row.deleted_at is not None, row.source_version) == (True, 3)
+
+def test_reshard_refuses_a_target_with_rows_unless_resuming(tmp_path, shards):
+    write(shards, project("a", version=2), project("b", version=2))
+    target = shard_set(tmp_path, "target", 2)
+    write(target, project("a", version=1))
+
+    with pytest.raises(ValueError, match="projects"):
+        reshard(shards, target)
+    assert reshard(shards, target, resume=True)["Project"] == 2
+    with Session(bind=target.for_key("b").engine) as db:
+        assert db.query(func.count(Project.id)).filter(Project.event_id == "b").scalar() == 1
+
+def test_reshard_copies_the_lowest_offset_every_shard_stored(tmp_path, shards):
+    save_offsets(shards.shards[0], {(TOPIC, 0): 10, (TOPIC, 1): 4})
+    save_offsets(shards.shards[1], {(TOPIC, 0): 7, (TOPIC, 1): 6})
+    save_offsets(shards.shards[2], {(TOPIC, 0): 9})
+    target = shard_set(tmp_path, "target", 2)
+
+    assert reshard(shards, target)["consumer_offsets"] == 1
+    for shard in target.shards:
+        db = shard.session_factory()
+        try:
+            repository = OffsetRepository(db)
+            assert repository.get(GROUP, TOPIC, 0) == 7
+            # Shard 2 never stored partition 1, so no offset is safe to resume from
+            assert repository.get(GROUP, TOPIC, 1) is None
+        finally:
+            db.close()
+
+def test_stored_offsets_load_as_the_lowest_every_shard_stored(shards):
+    save_offsets(shards.shards[0], {(TOPIC, 0): 10, (TOPIC, 1): 4})
+    save_offsets(shards.shards[1], {(TOPIC, 0): 7, (TOPIC, 1): 6})
+    save_offsets(shards.shards[2], {(TOPIC, 0): 9})
+    service = KafkaConsumerService()
+    service.shards = shards
+
+    assert service._load_stored_offsets([TopicPartition(TOPIC, 0), TopicPartition(TOPIC, 1)]) == {
+        TopicPartition(TOPIC, 0): 7
+    }
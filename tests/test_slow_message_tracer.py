@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from consumer_utils.slow_message_tracer import SlowMessageTracer
+
+def message(partition, offset):
+    return SimpleNamespace(topic="sales_events", partition=partition, offset=offset)
+
+def test_fast_messages_are_not_recorded():
+    tracer = SlowMessageTracer(threshold_ms=100, capacity=10)
+    assert not tracer.record(message(0, 0), "Project", {"decode": 0.01, "route": 0.01})
+    assert not tracer.record_batch([message(0, 0)], ["Project"], {"db_write": 0.05})
+    assert tracer.snapshot() == []
+
+def test_slow_batch_takes_one_entry_with_its_offset_ranges():
+    tracer = SlowMessageTracer(threshold_ms=100, capacity=200)
+    tracer.record(message(0, 0), "Opportunity", {"decode": 0.2})
+    messages = [message(offset % 2, offset) for offset in range(1, 2001)]
+    assert tracer.record_batch(messages, ["Project"] * 2000, {"db_write": 0.5, "db_commit": 0.1}, lane="bulk")
+
+    first, batch = tracer.snapshot()
+    assert (first["kind"], first["offset"]) == ("message", 0)
+    assert batch["kind"] == "batch" and batch["lane"] == "bulk" and batch["batch_size"] == 2000
+    assert batch["offsets"] == [
+        {"topic": "sales_events", "partition": 1, "first": 1, "last": 1999},
+        {"topic": "sales_events", "partition": 0, "first": 2, "last": 2000}
+    ]
+    assert batch["object_types"] == ["Project"]
+    assert batch["stages_ms"] == {"db_write": 500.0, "db_commit": 100.0}
@@ -0,0 +1,44 @@
+from consumer_business.processing_service import ProcessingService
+from core.constants_sample import EVENT_TYPE_DELETE
+from tests.helpers import project
+
+def delete(event_id, version=None):
+    payload = {"object_type": "Project", "event_type": EVENT_TYPE_DELETE, "event_id": event_id}
+    if version is not None:
+        payload["version"] = version
+    return payload
+
+def test_batch_keeps_the_newest_version_per_key(write):
+    counts = write(project("a", 5), project("a", 3))
+    assert counts == {"applied": 1, "deleted": 0, "skipped": 1}
+    assert write.row("a").name == "a-v5"
+
+def test_older_delete_does_not_tombstone_a_newer_row(write):
+    write(project("a", 5))
+    assert write(delete("a", 3))["deleted"] == 0
+    assert write.row("a").deleted_at is None
+
+def test_older_upsert_does_not_revive_a_newer_tombstone(write):
+    write(project("a", 5))
+    assert write(delete("a", 10))["deleted"] == 1
+    write(project("a", 4))
+    write(project("a", None))
+    row = write.row("a")
+    assert row.deleted_at is not None and row.name == "a-v5" and row.source_version == 10
+
+def test_newer_upsert_revives_a_tombstone(write):
+    write(project("a", 5))
+    write(delete("a", 10))
+    assert write(project("a", 11))["applied"] == 1
+    assert write.row("a").deleted_at is None
+
+def test_unversioned_tombstone_is_revived_by_any_upsert(write):
+    write(project("a", None))
+    write(delete("a"))
+    assert write(project("a", None))["applied"] == 1
+    assert write.row("a").deleted_at is None
+
+def test_delete_without_key_is_rejected_by_validation():
+    service = ProcessingService()
+    errors = service.validate_batch([delete(None), delete("a", "not-a-version"), delete("b", 3)])
+    assert set(errors) == {0, 1}
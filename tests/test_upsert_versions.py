@@ -0,0 +1,25 @@
+from tests.helpers import project
+
+def test_older_version_does_not_overwrite(write):
+    write(project("a", 5))
+    assert write(project("a", 3))["skipped"] == 1
+    assert (write.row("a").name, write.row("a").source_version) == ("a-v5", 5)
+    assert write(project("a", 6))["applied"] == 1
+    assert write.row("a").name == "a-v6"
+
+def test_unchanged_content_is_skipped(write):
+    write(project("a", None))
+    assert write(project("a", None))["skipped"] == 1
+
+def test_unversioned_event_keeps_the_stored_version(write):
+    write(project("a", 5))
+    write(project("a", None, name="renamed"))
+    assert (write.row("a").name, write.row("a").source_version) == ("renamed", 5)
+
+def test_reordered_json_keys_are_not_a_change(write):
+    first = project("a", None)
+    first["meta_data"] = {"region": "emea", "tier": {"level": 1, "name": "gold"}}
+    write(first)
+    second = project("a", None)
+    second["meta_data"] = {"tier": {"name": "gold", "level": 1}, "region": "emea"}
+    assert write(second)["skipped"] == 1